@@ -1,16 +1,232 @@
-from ._probeparsers import OpenFOAMVectorProbeParser
+from ._probeparsers import (OpenFOAMProbeParser,
+                            OpenFOAMScalarProbeParser,
+                            OpenFOAMVectorProbeParser,
+                            OpenFOAMSymmTensorProbeParser,
+                            OpenFOAMTensorProbeParser,
+                            PROBE_PARSERS,
+                            DEFAULT_CHUNK_ROWS,
+                            PARSER_VERSION,
+                            get_probe_parser,
+                            infer_probe_field_type)
+from ._probecache import ProbeCache, probe_fingerprint
+from ._probeset import ProbeSet, join_on_time, parse_probe_set
+from ._probeindex import (ProbeRowIndex,
+                          DEFAULT_INDEX_STRIDE,
+                          get_row_index,
+                          parse_probe_selection)
+from ._probedataset import ProbeDataset
+from ._fieldreader import (OpenFOAMField,
+                           field_type_from_class,
+                           read_openfoam_field)
+from ._probefollower import ProbeFileFollower
+from ._probemerge import (find_restart_probe_files,
+                          parse_probe_directory,
+                          splice_probe_arrays)
+from ._polymesh import (PolyMesh,
+                        compute_cell_centres,
+                        compute_face_geometry,
+                        read_polymesh)
+from ._decomposed import (find_processor_dirs,
+                          read_cell_proc_addressing,
+                          read_decomposed_cell_centres,
+                          read_decomposed_field)
+from ._functionobjects import (find_function_object_files,
+                               read_set_file,
+                               read_set_series,
+                               read_surface_file,
+                               read_surface_series)
+from ._sampling import (CellCentreSampler,
+                        get_case_sampler,
+                        line_points,
+                        plane_points,
+                        resolve_time_dir,
+                        sample_definitions)
 
 
-def _read_probe(probe_file):
+def _parse_openfoam_probe_file_to_dataframe(probe_file, parser):
     with open(probe_file) as f:
-        return f.read()
+        return parser.parse_probe_to_dfs(f)
 
 
-def _parse_openfoam_probe_file_to_dataframe(probe_file, parser):
-    probe_contents = _read_probe(probe_file)
-    return parser.parse_probe_to_dfs(probe_contents)
+def _parse_openfoam_probe_file_to_arrays(probe_file, parser):
+    with open(probe_file) as f:
+        return parser.parse_probe_to_arrays(f)
+
+
+def _parse_openfoam_probe_file_to_cached_arrays(probe_file, field_type,
+                                                cache: ProbeCache):
+    arrays = cache.load(probe_file, field_type)
+    if arrays is None:
+        parser = get_probe_parser(field_type)
+        arrays = _parse_openfoam_probe_file_to_arrays(probe_file, parser)
+        cache.store(probe_file, arrays, field_type)
+    return arrays
 
 
-def parse_openfoam_vectorprobe(probe_file):
+def _parse_openfoam_probe_selection_to_dataframe(probe_file, parser,
+                                                 probes, t_start, t_end):
+    times, values, header_lines = parse_probe_selection(
+        probe_file, parser, probes=probes, t_start=t_start, t_end=t_end)
+    positions = parser._get_probe_positions_from_header(header_lines)
+    if probes is None:
+        probes = list(positions)
+    probe_positions = {probe: positions[probe] for probe in probes}
+    dataset = parser.to_dataset(times, values, probe_ids=probes)
+    return dataset.to_dataframes(), probe_positions
+
+
+def parse_openfoam_vectorprobe(probe_file, probes=None, t_start=None,
+                               t_end=None):
+    """Parse a vector probe file into a dictionary of dataframes, one per
+    probe, and a dictionary of probe positions.
+
+    Parameters
+    ----------
+    probe_file : str
+    probes : Sequence[int]
+        Probe numbers to parse, all of them by default. Only the columns of
+        these probes are converted to floats.
+    t_start, t_end : float
+        Time window to parse, inclusive. The rows are located through a
+        sparse row index persisted next to the probe file on first use.
+    """
     parser = OpenFOAMVectorProbeParser()
+    if probes is None and t_start is None and t_end is None:
+        return _parse_openfoam_probe_file_to_dataframe(probe_file, parser)
+    return _parse_openfoam_probe_selection_to_dataframe(probe_file, parser,
+                                                        probes, t_start,
+                                                        t_end)
+
+
+def parse_openfoam_scalarprobe(probe_file, field_name="p"):
+    parser = OpenFOAMScalarProbeParser(field_name=field_name)
     return _parse_openfoam_probe_file_to_dataframe(probe_file, parser)
+
+
+def parse_openfoam_symmtensorprobe(probe_file, field_name="UPrime2Mean"):
+    parser = OpenFOAMSymmTensorProbeParser(field_name=field_name)
+    return _parse_openfoam_probe_file_to_dataframe(probe_file, parser)
+
+
+def parse_openfoam_tensorprobe(probe_file, field_name="gradU"):
+    parser = OpenFOAMTensorProbeParser(field_name=field_name)
+    return _parse_openfoam_probe_file_to_dataframe(probe_file, parser)
+
+
+def parse_openfoam_probe_arrays(probe_file, field_type="vector",
+                                cache: ProbeCache = None, probes=None,
+                                t_start=None, t_end=None):
+    """Parse a probe file into `(times, values, positions)` arrays.
+
+    Parameters
+    ----------
+    probe_file : str
+    field_type : str
+        One of "scalar", "vector", "symmTensor" or "tensor".
+    cache : ProbeCache
+        If given, the arrays are loaded from (or stored into) the cache.
+        Cached arrays are read-only memory maps by default. It is not used
+        when selecting probes or a time window.
+    probes : Sequence[int]
+        Probe numbers to parse, all of them by default. Only the columns of
+        these probes are converted to floats.
+    t_start, t_end : float
+        Time window to parse, inclusive. The rows are located through a
+        sparse row index persisted next to the probe file on first use.
+
+    Returns
+    -------
+    times : np.ndarray
+        Array of shape (n_times,).
+    values : np.ndarray
+        Contiguous array of shape (n_times, n_probes, n_components), with
+        n_components being 1, 3, 6 or 9 according to `field_type`.
+    positions : np.ndarray
+        Array of shape (n_probes, 3).
+    """
+    if probes is not None or t_start is not None or t_end is not None:
+        parser = get_probe_parser(field_type)
+        times, values, header_lines = parse_probe_selection(
+            probe_file, parser, probes=probes, t_start=t_start, t_end=t_end)
+        positions = parser._get_probe_position_array(header_lines)
+        if probes is not None:
+            positions = positions[list(probes)]
+        return times, values, positions
+    if cache is not None:
+        return _parse_openfoam_probe_file_to_cached_arrays(probe_file,
+                                                           field_type,
+                                                           cache)
+    parser = get_probe_parser(field_type)
+    return _parse_openfoam_probe_file_to_arrays(probe_file, parser)
+
+
+def parse_openfoam_probe_dataset(probe_file, field_type="vector",
+                                 cache: ProbeCache = None, probes=None,
+                                 t_start=None, t_end=None) -> ProbeDataset:
+    """Parse a probe file into a `ProbeDataset`. See
+    `parse_openfoam_probe_arrays` for the parameters."""
+    times, values, positions = parse_openfoam_probe_arrays(
+        probe_file, field_type=field_type, cache=cache, probes=probes,
+        t_start=t_start, t_end=t_end)
+    parser = get_probe_parser(field_type)
+    return parser.to_dataset(times, values, positions=positions,
+                             probe_ids=probes)
+
+
+def parse_openfoam_vectorprobe_arrays(probe_file, cache: ProbeCache = None,
+                                      probes=None, t_start=None, t_end=None):
+    """Parse a vector probe file into `(times, values, positions)` arrays,
+    `values` being of shape (n_times, n_probes, 3). See
+    `parse_openfoam_probe_arrays`."""
+    return parse_openfoam_probe_arrays(probe_file, field_type="vector",
+                                       cache=cache, probes=probes,
+                                       t_start=t_start, t_end=t_end)
+
+
+def iter_openfoam_probe(probe_file, field_type="vector",
+                        chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Iterate over a probe file in `(times, values)` blocks of at most
+    `chunk_rows` rows, `values` being of shape
+    (n_rows, n_probes, n_components).
+
+    Memory usage is bounded by the block size, so reductions over very long
+    records can be carried out block by block, e.g.
+
+    ```
+    total = 0
+    for times, values in iter_openfoam_probe(probe_file):
+        total += values.sum(axis=0)
+    ```
+    """
+    parser = get_probe_parser(field_type)
+    with open(probe_file) as f:
+        yield from parser.iter_probe_arrays(f, chunk_rows=chunk_rows)
+
+
+def iter_openfoam_vectorprobe(probe_file, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Iterate over a vector probe file in `(times, values)` blocks of at
+    most `chunk_rows` rows. See `iter_openfoam_probe`."""
+    return iter_openfoam_probe(probe_file, field_type="vector",
+                               chunk_rows=chunk_rows)
+
+
+def parse_openfoam_probe_positions(probe_file):
+    """Return the (n_probes, 3) array of probe locations of a probe file."""
+    parser = OpenFOAMVectorProbeParser()
+    with open(probe_file) as f:
+        return parser.parse_probe_positions(f)
+
+
+def follow_openfoam_probe(probe_file, field_type="vector"):
+    """Return a `ProbeFileFollower` which incrementally parses the rows
+    appended to a probe file written by a running case, e.g.
+
+    ```
+    follower = follow_openfoam_probe("postProcessing/probes/0/U")
+    while running:
+        new_times, new_values = follower.update()
+        ...
+        time.sleep(300)
+    ```
+    """
+    return ProbeFileFollower(probe_file, parser=get_probe_parser(field_type))
@@ -0,0 +1,117 @@
+import os
+import re
+import glob
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from ._fieldreader import OpenFOAMField, read_openfoam_field
+from ._polymesh import read_polymesh, _read_mesh_list
+
+
+def find_processor_dirs(case_dir):
+    """Return the `processorN` directories of a decomposed case sorted by
+    processor number."""
+    processor_dirs = [processor_dir for processor_dir
+                      in glob.glob(os.path.join(case_dir, "processor*"))
+                      if re.fullmatch(r"processor\d+",
+                                      os.path.basename(processor_dir))]
+    if not processor_dirs:
+        raise FileNotFoundError(f"No processor directories found in "
+                                f"{case_dir}.")
+    return sorted(processor_dirs,
+                  key=lambda processor_dir: int(
+                      os.path.basename(processor_dir)[len("processor"):]))
+
+
+def read_cell_proc_addressing(processor_dir):
+    """Global cell label of every cell of a processor."""
+    mesh_dir = os.path.join(processor_dir, "constant", "polyMesh")
+    return _read_mesh_list(mesh_dir, "cellProcAddressing",
+                           kind="label")[:, 0].astype(np.int64)
+
+
+def read_decomposed_field(case_dir, time_name, field_name,
+                          max_workers=None) -> OpenFOAMField:
+    """Read the internal field of a decomposed case without running
+    `reconstructPar`.
+
+    The processor directories are read in parallel by a process pool and
+    the pieces are scattered into the global cell order given by every
+    `cellProcAddressing`, i.e. the result matches the internal field of the
+    reconstructed case.
+
+    Boundary fields are not stitched, the returned field has none.
+
+    Parameters
+    ----------
+    case_dir : str
+        Path to the decomposed OpenFOAM case.
+    time_name : str
+        Name of the time directory, e.g. "0.5".
+    field_name : str
+        Name of the field, e.g. "UMean".
+    max_workers : int
+        Processes used to read the processor directories. Defaults to one
+        per CPU.
+
+    Returns
+    -------
+    OpenFOAMField
+    """
+    args = [(processor_dir, time_name, field_name)
+            for processor_dir in find_processor_dirs(case_dir)]
+    results = _map_processors(_read_processor_field, args, max_workers)
+    fields = [processor_field for _, processor_field in results]
+    internal_field = _stitch([addressing for addressing, _ in results],
+                             [processor_field.internal_field
+                              for processor_field in fields])
+    # Processors may each hold a uniform value but differ from each other.
+    uniform = (all(processor_field.uniform for processor_field in fields)
+               and len(internal_field) > 0
+               and bool(np.all(internal_field == internal_field[0])))
+    return OpenFOAMField(name=fields[0].name,
+                         field_class=fields[0].field_class,
+                         field_type=fields[0].field_type,
+                         internal_field=internal_field,
+                         uniform=uniform,
+                         dimensions=fields[0].dimensions)
+
+
+def read_decomposed_cell_centres(case_dir, max_workers=None):
+    """Cell centres of a decomposed case in global cell order, computed from
+    the processor meshes in parallel."""
+    args = [(processor_dir,)
+            for processor_dir in find_processor_dirs(case_dir)]
+    results = _map_processors(_read_processor_cell_centres, args,
+                              max_workers)
+    return _stitch(*zip(*results))
+
+
+def _map_processors(function, args, max_workers):
+    if len(args) == 1 or max_workers == 1:
+        return [function(*arg) for arg in args]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(function, *zip(*args)))
+
+
+def _stitch(addressings, values_list):
+    n_cells = sum(len(addressing) for addressing in addressings)
+    values_shape = values_list[0].shape[1:]
+    stitched = np.empty((n_cells, *values_shape),
+                        dtype=values_list[0].dtype)
+    for addressing, values in zip(addressings, values_list):
+        stitched[addressing] = values
+    return stitched
+
+
+def _read_processor_field(processor_dir, time_name, field_name):
+    addressing = read_cell_proc_addressing(processor_dir)
+    processor_field = read_openfoam_field(
+        os.path.join(processor_dir, time_name, field_name),
+        n_cells=len(addressing))
+    return addressing, processor_field
+
+
+def _read_processor_cell_centres(processor_dir):
+    addressing = read_cell_proc_addressing(processor_dir)
+    mesh = read_polymesh(os.path.join(processor_dir, "constant", "polyMesh"))
+    return addressing, mesh.cell_centres
@@ -0,0 +1,168 @@
+import re
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Any, Dict
+from ._probeparsers import PROBE_PARSERS
+from ._foamfile import FoamFileParser, PARENTHESES_TABLE, read_foam_file
+
+
+@dataclass
+class OpenFOAMField:
+    """Contents of an OpenFOAM field file.
+
+    Attributes:
+
+    name -- object name, e.g. "UMean"
+    field_class -- OpenFOAM class, e.g. "volVectorField"
+    field_type -- "scalar", "vector", "symmTensor" or "tensor"
+    internal_field -- array of shape (n_cells,) for scalars or
+                      (n_cells, n_components) otherwise. A uniform internal
+                      field holds a single row unless `n_cells` was given.
+    uniform -- whether the internal field was written as uniform
+    boundary_field -- mapping from patch name to its entries, values
+                      written as uniform/nonuniform are converted to arrays
+    dimensions -- SI dimension exponents
+    """
+    name: str
+    field_class: str
+    field_type: str
+    internal_field: np.ndarray
+    uniform: bool = False
+    boundary_field: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    dimensions: np.ndarray = None
+
+
+def read_openfoam_field(field_file, n_cells=None) -> OpenFOAMField:
+    """Read an OpenFOAM vol/surface/point field file without ParaView.
+
+    Both ascii and binary files (optionally gzipped) are supported. ascii
+    lists are converted by numpy's C tokenizer once the parentheses are
+    blanked out and binary lists are wrapped with `np.frombuffer`, so no
+    Python level loop over the values takes place.
+
+    SymmTensor components are returned in the order used by
+    `datatypes.SymmetricCartesianTensorStack`, i.e. (xx yy zz xy yz xz).
+
+    Parameters
+    ----------
+    field_file : str
+        Path to the field file, e.g. "case/0.5/UMean".
+    n_cells : int
+        If given, uniform internal fields are broadcast to this length.
+
+    Returns
+    -------
+    OpenFOAMField
+    """
+    return _FoamFieldParser(read_foam_file(field_file)).parse(n_cells)
+
+
+def field_type_from_class(field_class):
+    """Map an OpenFOAM class, e.g. "volSymmTensorField", to its field type,
+    e.g. "symmTensor"."""
+    match = re.fullmatch(r"(?:vol|surface|point)?(\w+?)Field", field_class)
+    if match is None:
+        raise ValueError(f"Unsupported field class '{field_class}'.")
+    field_type = match.group(1)
+    field_type = field_type[0].lower() + field_type[1:]
+    if field_type not in PROBE_PARSERS:
+        raise ValueError(f"Unsupported field class '{field_class}'.")
+    return field_type
+
+
+class _FoamFieldParser(FoamFileParser):
+    """Parser of the internal and boundary fields of a field file."""
+
+    def __init__(self, contents: bytes):
+        super().__init__(contents)
+        self.name = self.header.get("object", "")
+        self.field_class = self.header.get("class", "")
+        self.field_type = field_type_from_class(self.field_class)
+        parser_cls = PROBE_PARSERS[self.field_type]
+        self.n_components = parser_cls.n_components
+        self.component_order = parser_cls.component_order
+
+    def parse(self, n_cells=None) -> OpenFOAMField:
+        dimensions = None
+        internal_field = None
+        uniform = False
+        boundary_field = {}
+        while True:
+            keyword = self._read_word()
+            if not keyword:
+                break
+            if keyword == "dimensions":
+                dimensions = np.array(
+                    self._read_until(b";").strip(b"[] \n").split(),
+                    dtype=float)
+            elif keyword == "internalField":
+                internal_field, uniform = self._read_field_value()
+                self._expect(b";")
+            elif keyword == "boundaryField":
+                boundary_field = self._read_boundary_field()
+            else:
+                self._skip_entry()
+        if uniform and n_cells is not None:
+            internal_field = np.broadcast_to(
+                internal_field, (n_cells, *internal_field.shape[1:]))
+        return OpenFOAMField(name=self.name,
+                             field_class=self.field_class,
+                             field_type=self.field_type,
+                             internal_field=internal_field,
+                             uniform=uniform,
+                             boundary_field=boundary_field,
+                             dimensions=dimensions)
+
+    def _read_field_value(self):
+        """Read a `uniform <value>` or `nonuniform List<type> <list>` field
+        value, returning the array and whether it was uniform."""
+        kind = self._read_word()
+        if kind == "uniform":
+            value = self._read_until(b";", consume=False)
+            value = np.array(value.translate(PARENTHESES_TABLE).split(),
+                             dtype=float)
+            return self._shape_values(value.reshape(1, -1)), True
+        if kind != "nonuniform":
+            raise ValueError(f"Unexpected field value '{kind}' at byte "
+                             f"{self.pos}.")
+        self._read_word()  # List<type>
+        return self._shape_values(self._read_list(self.n_components)), False
+
+    def _shape_values(self, values):
+        if self.component_order is not None:
+            values = values[:, list(self.component_order)]
+        if self.n_components == 1:
+            return np.ascontiguousarray(values[:, 0])
+        return np.ascontiguousarray(values)
+
+    def _read_boundary_field(self):
+        self._expect(b"{")
+        patches = {}
+        while True:
+            self._skip_whitespace()
+            if self.contents[self.pos:self.pos + 1] == b"}":
+                self.pos += 1
+                return patches
+            patch_name = self._read_word()
+            self._expect(b"{")
+            patches[patch_name] = self._read_patch()
+
+    def _read_patch(self):
+        entries = {}
+        while True:
+            self._skip_whitespace()
+            if self.contents[self.pos:self.pos + 1] == b"}":
+                self.pos += 1
+                return entries
+            keyword = self._read_word()
+            self._skip_whitespace()
+            if self.contents.startswith((b"uniform", b"nonuniform"),
+                                        self.pos):
+                entries[keyword], _ = self._read_field_value()
+                self._expect(b";")
+            elif self.contents[self.pos:self.pos + 1] == b"{":
+                self._skip_braces()
+            elif self.contents.startswith(b"#{", self.pos):
+                entries[keyword] = self._read_verbatim().decode().strip()
+            else:
+                entries[keyword] = self._read_until(b";").decode().strip()
@@ -0,0 +1,209 @@
+import re
+import gzip
+import numpy as np
+
+PARENTHESES_TABLE = bytes.maketrans(b"()", b"  ")
+_WHITESPACE = b" \t\r\n"
+
+
+def read_foam_file(foam_file):
+    """Return the raw bytes of an OpenFOAM file, gunzipping "*.gz" files."""
+    opener = gzip.open if foam_file.endswith(".gz") else open
+    with opener(foam_file, "rb") as f:
+        return f.read()
+
+
+class FoamFileParser:
+    """Sequential parser over the bytes of an OpenFOAM file.
+
+    Dictionaries are walked entry by entry and binary lists are skipped by
+    their byte length, which is why their contents cannot be mistaken for
+    delimiters. ascii lists are converted by numpy's C tokenizer once the
+    parentheses are blanked out and binary lists are wrapped with
+    `np.frombuffer`.
+
+    Instance attributes:
+
+    self.contents -- bytes of the file
+    self.pos -- current position of the parser
+    self.header -- entries of the FoamFile dictionary
+    self.binary -- whether the file was written in binary format
+    self.scalar_bytes, self.label_bytes -- sizes read from the arch entry
+    """
+
+    def __init__(self, contents: bytes):
+        self.contents = contents
+        self.pos = 0
+        self.header = self._parse_header()
+        self.binary = self.header.get("format", "ascii") == "binary"
+        arch = self.header.get("arch", "")
+        self.scalar_bytes = self._arch_bytes(arch, "scalar", 8)
+        self.label_bytes = self._arch_bytes(arch, "label", 4)
+
+    def _parse_header(self):
+        start = self.contents.find(b"FoamFile")
+        if start < 0:
+            raise ValueError("Not an OpenFOAM file, missing FoamFile header.")
+        open_index = self.contents.index(b"{", start)
+        close_index = self.contents.index(b"}", open_index)
+        header_text = self.contents[open_index + 1:close_index].decode()
+        self.pos = close_index + 1
+        # Quoted values, e.g. the arch entry, may contain semicolons.
+        entries = re.findall(r'(\w+)\s+("[^"]*"|[^;]*);', header_text)
+        return {key: value.strip().strip('"') for key, value in entries}
+
+    @staticmethod
+    def _arch_bytes(arch, primitive, default):
+        match = re.search(rf"{primitive}=(\d+)", arch)
+        if match is None:
+            return default
+        return int(match.group(1))//8
+
+    def _read_list(self, n_components=1, kind="scalar"):
+        """Read a list of `n_components` tuples of scalars or labels, e.g.
+        `3((0 0 0) (1 0 0) (1 1 0))`, into an (n, n_components) array."""
+        n_values = self._read_count()
+        self._skip_whitespace()
+        n_items = n_values*n_components
+        dtype = self._dtype(kind)
+        if not n_values:
+            self._expect(b"(")
+            self._expect(b")")
+            return np.empty((0, n_components), dtype=dtype)
+        if self.contents[self.pos:self.pos + 1] == b"{":
+            # Uniform list, e.g. 10{(0 0 0)}.
+            close_index = self.contents.index(b"}", self.pos)
+            value = self.contents[self.pos + 1:close_index]
+            value = np.array(value.translate(PARENTHESES_TABLE).split(),
+                             dtype=dtype)
+            self.pos = close_index + 1
+            return np.tile(value, (n_values, 1))
+        self._expect(b"(")
+        if self.binary:
+            # Copied so that the returned arrays are writeable.
+            values = np.frombuffer(self.contents, dtype=dtype,
+                                   count=n_items, offset=self.pos).copy()
+            self.pos += n_items*dtype.itemsize
+            self._expect(b")")
+        else:
+            end = self._ascii_list_end()
+            text = self.contents[self.pos:end].translate(PARENTHESES_TABLE)
+            values = np.fromstring(text.decode(), dtype=dtype, sep=" ",
+                                   count=n_items)
+            self.pos = end + 1
+        return values.reshape(n_values, n_components)
+
+    def _read_count(self):
+        self._skip_whitespace()
+        count_end = self.pos
+        while self.contents[count_end:count_end + 1].isdigit():
+            count_end += 1
+        count = int(self.contents[self.pos:count_end])
+        self.pos = count_end
+        return count
+
+    def _dtype(self, kind):
+        if kind == "label":
+            return np.dtype(f"<i{self.label_bytes}")
+        return np.dtype(f"<f{self.scalar_bytes}")
+
+    def _ascii_list_end(self):
+        """Index of the parenthesis closing the list opened before pos."""
+        if self.contents[self.pos:self.pos + 1] == b"\n":
+            # One value per line, only the closing parenthesis starts a line.
+            return self.contents.index(b"\n)", self.pos) + 1
+        depth = 1
+        index = self.pos
+        while depth:
+            char = self.contents[index:index + 1]
+            if char == b"(":
+                depth += 1
+            elif char == b")":
+                depth -= 1
+            index += 1
+        return index - 1
+
+    def _skip_entry(self):
+        self._skip_whitespace()
+        if self.contents[self.pos:self.pos + 1] == b"{":
+            self._skip_braces()
+        elif self.contents.startswith(b"#{", self.pos):
+            self._read_verbatim()
+        else:
+            self._read_until(b";")
+
+    def _read_verbatim(self):
+        """Read a `#{ ... #}` verbatim block, e.g. the code of a coded
+        boundary condition, and its optional trailing `;`."""
+        self._expect(b"#{")
+        end = self.contents.find(b"#}", self.pos)
+        if end < 0:
+            raise ValueError(f"Unterminated verbatim block at byte "
+                             f"{self.pos}.")
+        text = self.contents[self.pos:end]
+        self.pos = end + 2
+        self._skip_whitespace()
+        if self.contents[self.pos:self.pos + 1] == b";":
+            self.pos += 1
+        return text
+
+    def _skip_braces(self):
+        depth = 0
+        while True:
+            if self.contents.startswith(b"#{", self.pos):
+                # Code may contain unbalanced braces.
+                self._read_verbatim()
+                continue
+            char = self.contents[self.pos:self.pos + 1]
+            self.pos += 1
+            if char == b"{":
+                depth += 1
+            elif char == b"}":
+                depth -= 1
+                if not depth:
+                    return
+            elif not char:
+                raise ValueError("Unbalanced braces in OpenFOAM file.")
+
+    def _skip_whitespace(self):
+        contents = self.contents
+        while True:
+            while contents[self.pos:self.pos + 1] in (b" ", b"\t", b"\r",
+                                                       b"\n"):
+                self.pos += 1
+            if contents.startswith(b"//", self.pos):
+                self.pos = contents.find(b"\n", self.pos)
+                if self.pos < 0:
+                    self.pos = len(contents)
+            elif contents.startswith(b"/*", self.pos):
+                self.pos = contents.index(b"*/", self.pos) + 2
+            else:
+                return
+
+    def _read_word(self):
+        self._skip_whitespace()
+        start = self.pos
+        if self.contents[start:start + 1] == b'"':
+            end = self.contents.index(b'"', start + 1) + 1
+        else:
+            end = start
+            while (end < len(self.contents)
+                   and self.contents[end] not in _WHITESPACE
+                   and self.contents[end:end + 1] not in (b"{", b"}", b";")):
+                end += 1
+        self.pos = end
+        return self.contents[start:end].decode().strip('"')
+
+    def _read_until(self, delimiter, consume=True):
+        end = self.contents.index(delimiter, self.pos)
+        text = self.contents[self.pos:end]
+        self.pos = end + len(delimiter) if consume else end
+        return text
+
+    def _expect(self, token):
+        self._skip_whitespace()
+        if not self.contents.startswith(token, self.pos):
+            found = self.contents[self.pos:self.pos + 20]
+            raise ValueError(f"Expected {token!r} at byte {self.pos}, "
+                             f"found {found!r}.")
+        self.pos += len(token)
@@ -0,0 +1,300 @@
+import os
+import re
+import glob
+import base64
+import numpy as np
+import xml.etree.ElementTree as ElementTree
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Sequence, Tuple
+from ._probeparsers import PROBE_PARSERS, tokenize_probe_lines
+from ._probeset import ProbeSet
+
+AXIS_COLUMNS = {"x": 1, "y": 1, "z": 1, "distance": 1, "xyz": 3}
+COORDINATE_COLUMNS = ("x", "y", "z", "distance")
+_COMPONENT_SUFFIX = re.compile(r"(.+)_([0-8]|[xyz]|[xyz][xyz])$")
+_N_COMPONENTS = {parser_cls.n_components: parser_cls
+                 for parser_cls in PROBE_PARSERS.values()}
+_VTK_DTYPES = {"Float32": "<f4", "Float64": "<f8",
+               "Int8": "<i1", "Int16": "<i2", "Int32": "<i4",
+               "Int64": "<i8", "UInt8": "<u1", "UInt16": "<u2",
+               "UInt32": "<u4", "UInt64": "<u8"}
+
+SampledData = Tuple[np.ndarray, Dict[str, np.ndarray]]
+
+
+def find_function_object_files(case_dir, function_name, file_name):
+    """Return the time instants and paths of the files written by a
+    function object, i.e. `postProcessing/<function_name>/<time>/<file_name>`,
+    sorted by time."""
+    pattern = os.path.join(case_dir, "postProcessing", function_name, "*",
+                           file_name)
+    time_files = {}
+    for time_file in glob.glob(pattern):
+        time_name = os.path.basename(os.path.dirname(time_file))
+        try:
+            time_files[float(time_name)] = time_file
+        except ValueError:
+            continue
+    times = np.array(sorted(time_files))
+    return times, [time_files[time] for time in times]
+
+
+def read_set_file(set_file, axis="xyz", fields: Sequence[str] = None
+                  ) -> SampledData:
+    """Read a file written by the `sets` function object in raw (".xy") or
+    csv format.
+
+    Parameters
+    ----------
+    set_file : str
+        Path to the file, e.g. "postProcessing/sets/0.5/line_U.xy".
+    axis : str
+        `axis` entry of the set, it determines how many coordinate columns
+        a raw file starts with. csv files name their columns and ignore it.
+    fields : Sequence[str]
+        Fields of a raw file in column order. By default they are taken
+        from the file name, "<set>_<field1>_<field2>.xy", assuming the set
+        name has no underscores.
+
+    Returns
+    -------
+    positions : np.ndarray
+        Array of shape (n_points, n_coordinates) with the coordinate
+        columns of the set.
+    fields : Dict[str, np.ndarray]
+        Arrays of shape (n_points, n_components) keyed by field name.
+    """
+    if set_file.endswith(".csv"):
+        with open(set_file) as f:
+            column_names = f.readline().strip().split(",")
+            table = np.loadtxt(f, delimiter=",", ndmin=2)
+        return _split_named_columns(table, column_names)
+    if axis not in AXIS_COLUMNS:
+        raise ValueError(f"Unknown set axis '{axis}'.")
+    if fields is None:
+        stem = os.path.splitext(os.path.basename(set_file))[0]
+        fields = stem.split("_")[1:]
+    with open(set_file) as f:
+        table = tokenize_probe_lines(f)
+    n_coordinates = AXIS_COLUMNS[axis]
+    n_field_columns = table.shape[1] - n_coordinates
+    n_components, remainder = divmod(n_field_columns, max(len(fields), 1))
+    if remainder or n_components not in _N_COMPONENTS:
+        raise ValueError(f"Cannot split {n_field_columns} columns of "
+                         f"{set_file} into fields {list(fields)}, please "
+                         f"provide the set axis and fields.")
+    return table[:, :n_coordinates], {
+        field_name: _reorder(table[:, start:start + n_components])
+        for field_name, start in zip(
+            fields, range(n_coordinates, table.shape[1], n_components))}
+
+
+def read_surface_file(surface_file) -> SampledData:
+    """Read a file written by the `surfaces` function object in raw or vtp
+    format.
+
+    Returns
+    -------
+    positions : np.ndarray
+        Array of shape (n_points, 3). Face centres for face data, the
+        surface points for point data.
+    fields : Dict[str, np.ndarray]
+        Arrays of shape (n_points, n_components) keyed by field name.
+    """
+    if surface_file.endswith(".vtp"):
+        return _read_vtp(surface_file)
+    with open(surface_file) as f:
+        header_lines = []
+        line = f.readline()
+        while line.startswith("#"):
+            header_lines.append(line)
+            line = f.readline()
+        table = tokenize_probe_lines([line] + f.readlines())
+    if not header_lines:
+        raise ValueError(f"Missing column names in {surface_file}.")
+    # Last header line names the columns, e.g. "#  x  y  z  U_x  U_y  U_z".
+    column_names = header_lines[-1].lstrip("#").split()
+    return _split_named_columns(table, column_names)
+
+
+def read_set_series(case_dir, file_name, function_name="sets",
+                    axis="xyz", fields: Sequence[str] = None,
+                    max_workers=None) -> ProbeSet:
+    """Read every time directory written by a `sets` function object into
+    arrays with a leading time axis.
+
+    Every sampled point is treated as a probe, so the result can be used
+    wherever probe data is, e.g. as the signal stack of `xcorr`.
+
+    Parameters
+    ----------
+    case_dir : str
+        Path to the OpenFOAM case.
+    file_name : str
+        Name of the file within every time directory, e.g. "line_U.xy".
+    function_name : str
+        Name of the function object.
+    axis, fields :
+        See `read_set_file`.
+    max_workers : int
+        Processes used to read the files. Defaults to one per CPU.
+
+    Returns
+    -------
+    ProbeSet
+        Fields of shape (n_times, n_points, n_components), positions of
+        shape (n_points, n_coordinates).
+    """
+    reader = partial(read_set_file, axis=axis, fields=fields)
+    return _read_series(case_dir, function_name, file_name, reader,
+                        max_workers)
+
+
+def read_surface_series(case_dir, file_name, function_name="surfaces",
+                        max_workers=None) -> ProbeSet:
+    """Read every time directory written by a `surfaces` function object
+    into arrays with a leading time axis. See `read_set_series`.
+
+    Parameters
+    ----------
+    case_dir : str
+        Path to the OpenFOAM case.
+    file_name : str
+        Name of the file within every time directory, e.g. "p_plane.raw"
+        or "plane.vtp".
+    function_name : str
+        Name of the function object.
+    max_workers : int
+        Processes used to read the files. Defaults to one per CPU.
+
+    Returns
+    -------
+    ProbeSet
+        Fields of shape (n_times, n_points, n_components), positions of
+        shape (n_points, 3).
+    """
+    return _read_series(case_dir, function_name, file_name,
+                        read_surface_file, max_workers)
+
+
+def _read_series(case_dir, function_name, file_name, reader, max_workers):
+    times, time_files = find_function_object_files(case_dir, function_name,
+                                                   file_name)
+    if not time_files:
+        raise FileNotFoundError(f"No '{file_name}' files found for function "
+                                f"object '{function_name}' in {case_dir}.")
+    if len(time_files) == 1 or max_workers == 1:
+        return _stack_results(times, map(reader, time_files), time_files)
+    # Many small files, batch them to amortize the inter process calls.
+    chunksize = max(1, len(time_files)//(4*(max_workers or os.cpu_count())))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(reader, time_files, chunksize=chunksize)
+        return _stack_results(times, results, time_files)
+
+
+def _stack_results(times, results, time_files):
+    fields = None
+    positions = None
+    for i, (time_positions, time_fields) in enumerate(results):
+        if fields is None:
+            positions = time_positions
+            fields = {field_name: np.empty((len(times), *values.shape))
+                      for field_name, values in time_fields.items()}
+        if time_positions.shape != positions.shape:
+            raise ValueError(f"{time_files[i]} has {len(time_positions)} "
+                             f"points, expected {len(positions)}.")
+        for field_name, values in time_fields.items():
+            fields[field_name][i] = values
+    return ProbeSet(times=times, fields=fields,
+                    positions={field_name: positions
+                               for field_name in fields})
+
+
+def _split_named_columns(table, column_names) -> SampledData:
+    """Split a table into coordinates and fields based on its column names,
+    components are recognized by their suffix, e.g. "U_x" or "U_0"."""
+    if len(column_names) != table.shape[1]:
+        raise ValueError(f"Found {len(column_names)} column names for "
+                         f"{table.shape[1]} columns.")
+    coordinate_columns = []
+    field_columns = {}
+    for i, column_name in enumerate(column_names):
+        if column_name in COORDINATE_COLUMNS:
+            coordinate_columns.append(i)
+            continue
+        match = _COMPONENT_SUFFIX.match(column_name)
+        field_name = match.group(1) if match else column_name
+        field_columns.setdefault(field_name, []).append(i)
+    return table[:, coordinate_columns], {
+        field_name: _reorder(table[:, columns])
+        for field_name, columns in field_columns.items()}
+
+
+def _reorder(values):
+    """Arrange components in the order used by the probe parsers."""
+    parser_cls = _N_COMPONENTS.get(values.shape[1])
+    if parser_cls is None or parser_cls.component_order is None:
+        return np.ascontiguousarray(values)
+    return np.ascontiguousarray(values[:, list(parser_cls.component_order)])
+
+
+def _read_vtp(vtp_file) -> SampledData:
+    """Read a VTK XML PolyData file written with ascii or inline binary
+    (base64) data arrays. Components are already in VTK order, which
+    matches the one of the probe parsers."""
+    root = ElementTree.parse(vtp_file).getroot()
+    if root.get("compressor"):
+        raise ValueError(f"Compressed vtp files are not supported: "
+                         f"{vtp_file}.")
+    header_dtype = np.dtype(_VTK_DTYPES[root.get("header_type", "UInt32")])
+    piece = root.find("PolyData/Piece")
+    points = _read_vtk_array(piece.find("Points/DataArray"), header_dtype)
+    cell_arrays = piece.findall("CellData/DataArray")
+    if not cell_arrays:
+        return points, {data_array.get("Name"):
+                        _read_vtk_array(data_array, header_dtype)
+                        for data_array in piece.findall(
+                            "PointData/DataArray")}
+    polys = {data_array.get("Name"): _read_vtk_array(data_array,
+                                                     header_dtype)[:, 0]
+             for data_array in piece.findall("Polys/DataArray")}
+    offsets = polys["offsets"].astype(np.int64)
+    face_starts = np.concatenate([[0], offsets[:-1]])
+    face_centres = (np.add.reduceat(points[polys["connectivity"]],
+                                    face_starts, axis=0)
+                    / np.diff(offsets, prepend=0)[:, np.newaxis])
+    return face_centres, {data_array.get("Name"):
+                          _read_vtk_array(data_array, header_dtype)
+                          for data_array in cell_arrays}
+
+
+def _read_vtk_array(data_array, header_dtype):
+    data_format = data_array.get("format", "ascii")
+    dtype = np.dtype(_VTK_DTYPES[data_array.get("type", "Float64")])
+    n_components = int(data_array.get("NumberOfComponents", 1))
+    text = data_array.text or ""
+    if data_format == "ascii":
+        values = np.fromstring(text, dtype=dtype, sep=" ")
+    elif data_format == "binary":
+        values = _decode_vtk_binary(text.strip(), dtype, header_dtype)
+    else:
+        raise ValueError(f"Unsupported vtp data format '{data_format}'.")
+    return values.reshape(-1, n_components).astype(
+        float if dtype.kind == "f" else dtype)
+
+
+def _decode_vtk_binary(text, dtype, header_dtype):
+    """Decode an inline binary data array, i.e. a base64 encoded byte count
+    followed by the data. Writers encode both either as one stream or as two
+    separately padded ones."""
+    header_chars = 4*-(-header_dtype.itemsize//3)
+    if text[header_chars - 1:header_chars] == "=":
+        header = base64.b64decode(text[:header_chars])
+        data = base64.b64decode(text[header_chars:])
+    else:
+        raw = base64.b64decode(text)
+        header = raw[:header_dtype.itemsize]
+        data = raw[header_dtype.itemsize:]
+    n_bytes = int(np.frombuffer(header, dtype=header_dtype)[0])
+    return np.frombuffer(data, dtype=dtype, count=n_bytes//dtype.itemsize)
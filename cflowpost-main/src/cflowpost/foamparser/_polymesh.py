@@ -0,0 +1,179 @@
+import os
+import re
+import numpy as np
+from dataclasses import dataclass
+from functools import cached_property
+from ._foamfile import FoamFileParser, PARENTHESES_TABLE, read_foam_file
+
+
+@dataclass
+class PolyMesh:
+    """OpenFOAM polyMesh in face-compact form.
+
+    Attributes:
+
+    points -- (n_points, 3) array of point coordinates
+    face_offsets -- (n_faces + 1,) start of every face in `face_labels`
+    face_labels -- point labels of all faces, one after the other
+    owner -- (n_faces,) owner cell of every face
+    neighbour -- (n_internal_faces,) neighbour cell of every internal face
+    """
+    points: np.ndarray
+    face_offsets: np.ndarray
+    face_labels: np.ndarray
+    owner: np.ndarray
+    neighbour: np.ndarray
+
+    @property
+    def n_faces(self):
+        return len(self.owner)
+
+    @property
+    def n_cells(self):
+        return int(max(self.owner.max(initial=-1),
+                       self.neighbour.max(initial=-1))) + 1
+
+    @cached_property
+    def face_geometry(self):
+        """Face centres and area vectors, shape (n_faces, 3) each."""
+        return compute_face_geometry(self.points, self.face_offsets,
+                                     self.face_labels)
+
+    @cached_property
+    def cell_centres(self):
+        """(n_cells, 3) array of cell centres, computed once."""
+        face_centres, face_areas = self.face_geometry
+        return compute_cell_centres(face_centres, face_areas, self.owner,
+                                    self.neighbour, self.n_cells)
+
+
+def read_polymesh(mesh_dir) -> PolyMesh:
+    """Read `points`, `faces`, `owner` and `neighbour` from a polyMesh
+    directory, e.g. "case/constant/polyMesh". ascii, binary and gzipped
+    files are supported."""
+    points = _read_mesh_list(mesh_dir, "points", n_components=3)
+    face_offsets, face_labels = _read_faces(mesh_dir)
+    owner = _read_mesh_list(mesh_dir, "owner", kind="label")[:, 0]
+    neighbour = _read_mesh_list(mesh_dir, "neighbour", kind="label")[:, 0]
+    return PolyMesh(points=points,
+                    face_offsets=face_offsets.astype(np.int64),
+                    face_labels=face_labels.astype(np.int64),
+                    owner=owner.astype(np.int64),
+                    neighbour=neighbour.astype(np.int64))
+
+
+def compute_face_geometry(points, face_offsets, face_labels):
+    """Compute face centres and area vectors as OpenFOAM does, i.e. by
+    decomposing every face into triangles around its average point.
+
+    Every face is handled at once, looping over faces is avoided by
+    reducing the per-triangle quantities with `np.add.reduceat`.
+    """
+    face_sizes = np.diff(face_offsets)
+    face_starts = face_offsets[:-1]
+    face_points = points[face_labels]
+    average_points = (np.add.reduceat(face_points, face_starts, axis=0)
+                      / face_sizes[:, np.newaxis])
+    # Next point of every face point, wrapping around at the last one.
+    next_index = np.arange(1, len(face_labels) + 1)
+    next_index[face_offsets[1:] - 1] = face_starts
+    next_points = face_points[next_index]
+    centre_points = np.repeat(average_points, face_sizes, axis=0)
+    triangle_centres = (face_points + next_points + centre_points)/3
+    triangle_areas = 0.5*np.cross(next_points - face_points,
+                                  centre_points - face_points)
+    triangle_mags = np.linalg.norm(triangle_areas, axis=1)
+    face_areas = np.add.reduceat(triangle_areas, face_starts, axis=0)
+    face_mags = np.add.reduceat(triangle_mags, face_starts)
+    weighted_centres = np.add.reduceat(
+        triangle_mags[:, np.newaxis]*triangle_centres, face_starts, axis=0)
+    degenerate = face_mags <= np.finfo(float).tiny
+    face_mags[degenerate] = 1
+    face_centres = weighted_centres/face_mags[:, np.newaxis]
+    face_centres[degenerate] = average_points[degenerate]
+    return face_centres, face_areas
+
+
+def compute_cell_centres(face_centres, face_areas, owner, neighbour,
+                         n_cells):
+    """Compute cell centres as the volume weighted centroids of the
+    pyramids formed by each face and the average of the cell face centres.
+    """
+    n_internal = len(neighbour)
+    face_cells = np.concatenate([owner, neighbour])
+    cell_faces = np.concatenate([np.arange(len(owner)),
+                                 np.arange(n_internal)])
+    face_counts = np.bincount(face_cells, minlength=n_cells)
+    estimated_centres = _sum_by_cell(face_centres[cell_faces], face_cells,
+                                     n_cells)/face_counts[:, np.newaxis]
+    # Face area vectors point out of the owner and into the neighbour.
+    orientation = np.concatenate([np.ones(len(owner)),
+                                  -np.ones(n_internal)])
+    pyramid_heights = face_centres[cell_faces] - estimated_centres[face_cells]
+    pyramid_volumes = orientation*np.einsum("ij,ij->i",
+                                            face_areas[cell_faces],
+                                            pyramid_heights)
+    pyramid_centres = (0.75*face_centres[cell_faces]
+                       + 0.25*estimated_centres[face_cells])
+    cell_volumes = np.bincount(face_cells, weights=pyramid_volumes,
+                               minlength=n_cells)
+    cell_centres = _sum_by_cell(pyramid_volumes[:, np.newaxis]
+                                * pyramid_centres, face_cells, n_cells)
+    degenerate = np.abs(cell_volumes) <= np.finfo(float).tiny
+    cell_volumes[degenerate] = 1
+    cell_centres /= cell_volumes[:, np.newaxis]
+    cell_centres[degenerate] = estimated_centres[degenerate]
+    return cell_centres
+
+
+def _sum_by_cell(values, cells, n_cells):
+    return np.column_stack([np.bincount(cells, weights=values[:, i],
+                                        minlength=n_cells)
+                            for i in range(values.shape[1])])
+
+
+class _PolyMeshParser(FoamFileParser):
+
+    def read_list(self, n_components=1, kind="scalar"):
+        return self._read_list(n_components, kind)
+
+    def read_faces(self):
+        """Read a faceList or faceCompactList, returning the face offsets
+        and the concatenated point labels."""
+        if self.header.get("class") == "faceCompactList":
+            face_offsets = self._read_list(kind="label")[:, 0]
+            face_labels = self._read_list(kind="label")[:, 0]
+            return face_offsets, face_labels
+        n_faces = self._read_count()
+        self._expect(b"(")
+        end = self._ascii_list_end()
+        body = self.contents[self.pos:end]
+        self.pos = end + 1
+        face_sizes = np.array(re.findall(rb"(\d+)\s*\(", body), dtype=np.int64)
+        if len(face_sizes) != n_faces:
+            raise ValueError(f"Expected {n_faces} faces, found "
+                             f"{len(face_sizes)}.")
+        tokens = np.fromstring(body.translate(PARENTHESES_TABLE).decode(),
+                               dtype=np.int64, sep=" ")
+        # Every face is written as its size followed by its labels.
+        size_positions = np.concatenate([[0], np.cumsum(face_sizes + 1)[:-1]])
+        face_labels = np.delete(tokens, size_positions)
+        face_offsets = np.concatenate([[0], np.cumsum(face_sizes)])
+        return face_offsets, face_labels
+
+
+def _mesh_file(mesh_dir, name):
+    mesh_file = os.path.join(mesh_dir, name)
+    if not os.path.isfile(mesh_file) and os.path.isfile(f"{mesh_file}.gz"):
+        return f"{mesh_file}.gz"
+    return mesh_file
+
+
+def _read_mesh_list(mesh_dir, name, n_components=1, kind="scalar"):
+    parser = _PolyMeshParser(read_foam_file(_mesh_file(mesh_dir, name)))
+    return parser.read_list(n_components, kind)
+
+
+def _read_faces(mesh_dir):
+    parser = _PolyMeshParser(read_foam_file(_mesh_file(mesh_dir, "faces")))
+    return parser.read_faces()
@@ -0,0 +1,146 @@
+import os
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+from ._probeparsers import PARSER_VERSION
+
+PROBE_CACHE_DIR = os.environ.get("CFLOWPOST_CACHE_DIR")
+CACHE_DIRNAME = ".probecache"
+DEFAULT_MAX_CACHE_BYTES = 20*1024**3
+_ARRAY_NAMES = ("times", "values", "positions")
+
+
+class ProbeCache:
+    """Binary cache of parsed probe arrays.
+
+    Each parsed file is stored as a directory of `.npy` files, so hits are
+    opened as memory maps instead of being read. Entries are keyed by the
+    absolute path, size and modification time of the source file, the field
+    type and `PARSER_VERSION`, thus any change of the probe file or of the
+    parser invalidates them.
+
+    Once the total size of the cache exceeds `max_bytes` the least recently
+    used entries are removed. Without a `cache_dir` the total covers the
+    `.probecache` directories of every probe file this cache has stored or
+    loaded, see `cache_dirs`.
+
+    Instance attributes:
+
+    self.cache_dir -- directory holding the entries. If None the entries are
+                      stored in a `.probecache` directory next to each probe
+                      file. Defaults to the `CFLOWPOST_CACHE_DIR` environment
+                      variable.
+    self.max_bytes -- maximum total size of the entries
+    self.mmap_mode -- mode used by `np.load` to open the cached arrays
+    """
+
+    def __init__(self, cache_dir=PROBE_CACHE_DIR,
+                 max_bytes=DEFAULT_MAX_CACHE_BYTES, mmap_mode="r"):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.mmap_mode = mmap_mode
+        # Directories used so far, the entries of a cache without root.
+        self._cache_dirs = set()
+
+    def load(self, probe_file, field_type="vector"):
+        """Return the cached `(times, values, positions)` of a probe file or
+        None if there is no valid entry."""
+        entry_dir = self._entry_dir(probe_file, field_type)
+        if not os.path.isdir(entry_dir):
+            return None
+        try:
+            arrays = tuple(np.load(os.path.join(entry_dir, f"{name}.npy"),
+                                   mmap_mode=self.mmap_mode)
+                           for name in _ARRAY_NAMES)
+        except (OSError, ValueError):
+            return None
+        # Mark the entry as recently used.
+        os.utime(entry_dir)
+        self._cache_dirs.add(os.path.dirname(entry_dir))
+        return arrays
+
+    def store(self, probe_file, arrays, field_type="vector", evict=True):
+        """Store the `(times, values, positions)` of a probe file and, if
+        `evict`, remove old entries if the cache grew too large."""
+        entry_dir = self._entry_dir(probe_file, field_type)
+        cache_dir = os.path.dirname(entry_dir)
+        os.makedirs(cache_dir, exist_ok=True)
+        self._cache_dirs.add(cache_dir)
+        temp_dir = tempfile.mkdtemp(dir=cache_dir, prefix=".tmp")
+        for name, array in zip(_ARRAY_NAMES, arrays):
+            np.save(os.path.join(temp_dir, f"{name}.npy"),
+                    np.ascontiguousarray(array))
+        try:
+            # Renaming makes the entry visible atomically.
+            os.rename(temp_dir, entry_dir)
+        except OSError:
+            # Stored meanwhile by another process.
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        if evict:
+            self.evict()
+
+    def cache_dirs(self):
+        """Directories holding the entries, `cache_dir` or, if it is None,
+        the `.probecache` directories used by this cache so far."""
+        if self.cache_dir is not None:
+            return [self.cache_dir]
+        return sorted(self._cache_dirs)
+
+    def evict(self, cache_dir=None):
+        """Remove the least recently used entries until the total size of
+        the entries of `cache_dirs`, or of `cache_dir` if given, is below
+        `max_bytes`."""
+        entries = [os.path.join(dir_, name)
+                   for dir_ in self._resolve_cache_dirs(cache_dir)
+                   if os.path.isdir(dir_)
+                   for name in os.listdir(dir_)
+                   if not name.startswith(".")]
+        entries = sorted(entries, key=os.path.getmtime)
+        sizes = [_dir_size(entry) for entry in entries]
+        total = sum(sizes)
+        for entry, size in zip(entries, sizes):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def clear(self, cache_dir=None):
+        """Remove the directories of `cache_dirs`, or `cache_dir` if
+        given."""
+        for dir_ in self._resolve_cache_dirs(cache_dir):
+            shutil.rmtree(dir_, ignore_errors=True)
+        if cache_dir is None:
+            self._cache_dirs.clear()
+
+    def _resolve_cache_dirs(self, cache_dir):
+        if cache_dir is not None:
+            return [cache_dir]
+        cache_dirs = self.cache_dirs()
+        if not cache_dirs:
+            raise ValueError("No cache directory known, pass cache_dir, set "
+                             "CFLOWPOST_CACHE_DIR or store an entry first.")
+        return cache_dirs
+
+    def _entry_dir(self, probe_file, field_type):
+        probe_file = os.path.abspath(probe_file)
+        cache_dir = self.cache_dir
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.dirname(probe_file),
+                                     CACHE_DIRNAME)
+        return os.path.join(cache_dir, probe_fingerprint(probe_file,
+                                                         field_type))
+
+
+def probe_fingerprint(probe_file, field_type="vector"):
+    """Hash identifying the current state of a probe file."""
+    probe_file = os.path.abspath(probe_file)
+    stat = os.stat(probe_file)
+    key = (f"{probe_file}|{stat.st_size}|{stat.st_mtime_ns}|{field_type}|"
+           f"{PARSER_VERSION}")
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def _dir_size(dir_):
+    return sum(entry.stat().st_size for entry in os.scandir(dir_)
+               if entry.is_file())
@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+from typing import Sequence, Union
+
+ProbeSelection = Union[int, slice, Sequence[int]]
+
+
+class ProbeDataset:
+    """Transient probe data backed by a single contiguous array.
+
+    Every probe shares the same time axis, so selecting probes, components
+    or a time window only slices `values`. Basic slices (single probes,
+    probe ranges, time windows) return views, no data is copied.
+
+    Instance attributes:
+
+    self.times -- (n_times,) array of time instants
+    self.values -- (n_times, n_probes, n_components) array
+    self.positions -- (n_probes, 3) array of probe locations
+    self.probe_ids -- (n_probes,) probe numbers as written by OpenFOAM
+    self.field_name -- name of the probed field, e.g. "U"
+    self.components -- suffixes of the components, e.g. ("x", "y", "z")
+    """
+
+    def __init__(self, times, values, positions=None, probe_ids=None,
+                 field_name="", components=None):
+        self.times = np.asarray(times)
+        self.values = np.asarray(values)
+        if self.values.ndim == 2:
+            self.values = self.values[..., np.newaxis]
+        n_probes = self.values.shape[1]
+        if positions is None:
+            positions = np.full((n_probes, 3), np.nan)
+        if probe_ids is None:
+            probe_ids = np.arange(n_probes)
+        if components is None:
+            components = tuple(str(i) for i in range(self.values.shape[2]))
+        self.positions = np.asarray(positions)
+        self.probe_ids = np.asarray(probe_ids)
+        self.field_name = field_name
+        self.components = tuple(components)
+
+    @property
+    def n_times(self):
+        return self.values.shape[0]
+
+    @property
+    def n_probes(self):
+        return self.values.shape[1]
+
+    @property
+    def n_components(self):
+        return self.values.shape[2]
+
+    def __len__(self):
+        return self.n_times
+
+    def __repr__(self):
+        return (f"{self.__class__.__name__}(field_name={self.field_name!r}, "
+                f"n_times={self.n_times}, n_probes={self.n_probes}, "
+                f"components={self.components})")
+
+    def select(self, probes: ProbeSelection = None, components=None,
+               t_start=None, t_end=None):
+        """Return a dataset restricted to some probes, components and/or a
+        time window. Probes and components are selected by position and
+        may also be given by component suffix, e.g. components="z"."""
+        time_slice = self._time_slice(t_start, t_end)
+        probe_index = self._as_index(probes)
+        component_index = self._as_index(self._component_positions(
+            components))
+        values = self.values[time_slice]
+        if isinstance(probe_index, slice):
+            values = values[:, probe_index]
+        else:
+            values = np.take(values, probe_index, axis=1)
+        if isinstance(component_index, slice):
+            values = values[..., component_index]
+        else:
+            values = np.take(values, component_index, axis=2)
+        return self.__class__(times=self.times[time_slice],
+                              values=values,
+                              positions=self.positions[probe_index],
+                              probe_ids=self.probe_ids[probe_index],
+                              field_name=self.field_name,
+                              components=np.array(self.components,
+                                                  dtype=object)[
+                                  component_index].tolist())
+
+    def probe(self, probe: int) -> np.ndarray:
+        """(n_times, n_components) view of a single probe."""
+        return self.values[:, probe]
+
+    def component(self, component: Union[int, str]) -> np.ndarray:
+        """(n_times, n_probes) view of a single component."""
+        return self.values[..., self._component_positions(component)]
+
+    def time_window(self, t_start=None, t_end=None):
+        """Dataset restricted to t_start <= times <= t_end, a view."""
+        return self.select(t_start=t_start, t_end=t_end)
+
+    def to_dataframes(self):
+        """Returns a dictionary of dataframes, the format returned by
+        `OpenFOAMProbeParser.parse_probe_to_dfs`.
+
+        Each key represents a probe.
+
+        Each dataframe contains the transient data for the field
+        components of ONLY ONE PROBE, sharing the memory of `values` where
+        pandas allows it."""
+        return {f"{self.field_name}_{probe_id}": self.to_dataframe(i)
+                for i, probe_id in enumerate(self.probe_ids)}
+
+    def to_dataframe(self, probe: int = None) -> pd.DataFrame:
+        """Convert the dataset into a dataframe.
+
+        If `probe` is given the dataframe of that probe alone is returned,
+        with a "Time" column and one column per component. Otherwise a
+        dataframe indexed by time with (probe, component) column levels.
+        """
+        field = self.field_name
+        if probe is not None:
+            columns = {"Time": self.times}
+            for j, comp in enumerate(self.components):
+                columns[f"{field}{comp}"] = self.values[:, probe, j]
+            return pd.DataFrame(columns, copy=False)
+        column_index = pd.MultiIndex.from_product(
+            [self.probe_ids, [f"{field}{comp}" for comp in self.components]],
+            names=["Probe", "Component"])
+        return pd.DataFrame(self.values.reshape(self.n_times, -1),
+                            index=pd.Index(self.times, name="Time"),
+                            columns=column_index)
+
+    def _time_slice(self, t_start, t_end):
+        start = 0
+        end = self.n_times
+        if t_start is not None:
+            start = np.searchsorted(self.times, t_start, side="left")
+        if t_end is not None:
+            end = np.searchsorted(self.times, t_end, side="right")
+        return slice(start, end)
+
+    def _component_positions(self, components):
+        if components is None:
+            return None
+        if isinstance(components, str):
+            return self.components.index(components)
+        if isinstance(components, (int, np.integer, slice)):
+            return components
+        return [self.components.index(comp) if isinstance(comp, str)
+                else comp for comp in components]
+
+    @staticmethod
+    def _as_index(selection):
+        if selection is None:
+            return slice(None)
+        if isinstance(selection, (int, np.integer)):
+            # Keep the dimension, i.e. select a range of length one.
+            return slice(selection, selection + 1 or None)
+        if isinstance(selection, slice):
+            return selection
+        return np.asarray(selection, dtype=int)
@@ -0,0 +1,144 @@
+import os
+import numpy as np
+from ._probeparsers import (OpenFOAMProbeParser,
+                            OpenFOAMVectorProbeParser,
+                            tokenize_probe_lines)
+
+
+class ProbeFileFollower:
+    """Incremental reader for a probe file which is still being written.
+
+    Every call to `update` reads the file from the byte offset reached on
+    the previous call, so its cost only depends on the amount of appended
+    data. A trailing line which has not been completely flushed yet is left
+    for the next call. The last complete line read is remembered and checked
+    again on every update, in case the file has been truncated or replaced
+    (e.g. by a restart) the follower starts over.
+
+    Parsed rows are stored in arrays whose capacity is doubled when needed,
+    thus appending rows has an amortized constant cost.
+
+    Instance attributes:
+
+    self.probe_file -- path to the probe file being followed
+    self.parser -- `OpenFOAMProbeParser` used to split the probe table
+    self.positions -- (n_probes, 3) array, None until the header is read
+    """
+
+    def __init__(self, probe_file, parser: OpenFOAMProbeParser = None,
+                 initial_capacity=1024):
+        if parser is None:
+            parser = OpenFOAMVectorProbeParser()
+        self.probe_file = probe_file
+        self.parser = parser
+        self._initial_capacity = initial_capacity
+        self.reset()
+
+    def reset(self):
+        """Forget everything read so far."""
+        self.positions = None
+        self._header_lines = []
+        self._offset = 0
+        self._last_line = b""
+        self._size = 0
+        self._times = None
+        self._values = None
+
+    @property
+    def times(self) -> np.ndarray:
+        """View over the (n_times,) array of time instants read so far."""
+        if self._times is None:
+            return np.empty(0)
+        return self._times[:self._size]
+
+    @property
+    def values(self) -> np.ndarray:
+        """View over the (n_times, n_probes, n_components) array read so
+        far."""
+        if self._values is None:
+            n_probes = 0 if self.positions is None else len(self.positions)
+            return np.empty((0, n_probes, self.parser.n_components))
+        return self._values[:self._size]
+
+    def __len__(self):
+        return self._size
+
+    def update(self):
+        """Parse the rows appended since the previous call.
+
+        Returns
+        -------
+        times : np.ndarray
+            Time instants of the new rows.
+        values : np.ndarray
+            Array of shape (n_new_rows, n_probes, n_components) with the new
+            rows. Both arrays are views over the stored data.
+        """
+        if not self._is_unchanged():
+            self.reset()
+        new_lines = self._read_complete_lines()
+        data_lines = self._consume_header(new_lines)
+        start = self._size
+        if data_lines:
+            table = tokenize_probe_lines(data_lines)
+            if table.size:
+                self._append(*self.parser._split_table(table))
+        return self.times[start:], self.values[start:]
+
+    def _is_unchanged(self):
+        """Check that the previously read contents are still in place."""
+        if not self._offset:
+            return True
+        try:
+            if os.path.getsize(self.probe_file) < self._offset:
+                return False
+        except FileNotFoundError:
+            return False
+        with open(self.probe_file, "rb") as f:
+            f.seek(self._offset - len(self._last_line))
+            return f.read(len(self._last_line)) == self._last_line
+
+    def _read_complete_lines(self):
+        with open(self.probe_file, "rb") as f:
+            f.seek(self._offset)
+            new_bytes = f.read()
+        complete_end = new_bytes.rfind(b"\n") + 1
+        if not complete_end:
+            return []
+        complete_bytes = new_bytes[:complete_end]
+        self._offset += complete_end
+        previous_line_end = complete_bytes.rfind(b"\n", 0, complete_end - 1)
+        self._last_line = complete_bytes[previous_line_end + 1:]
+        return complete_bytes.decode().splitlines()
+
+    def _consume_header(self, lines):
+        """Store the header lines, returning the remaining data lines."""
+        if self.positions is not None:
+            return lines
+        for i, line in enumerate(lines):
+            if line.startswith("#"):
+                self._header_lines.append(line)
+                continue
+            self.positions = self.parser._get_probe_position_array(
+                self._header_lines)
+            return lines[i:]
+        return []
+
+    def _append(self, times, values):
+        new_size = self._size + len(times)
+        if self._times is None:
+            capacity = max(self._initial_capacity, new_size)
+            self._times = np.empty(capacity)
+            self._values = np.empty((capacity, *values.shape[1:]))
+        elif new_size > len(self._times):
+            capacity = max(2*len(self._times), new_size)
+            self._times = self._grow(self._times, capacity)
+            self._values = self._grow(self._values, capacity)
+        self._times[self._size:new_size] = times
+        self._values[self._size:new_size] = values
+        self._size = new_size
+
+    def _grow(self, array, capacity):
+        grown = np.empty((capacity, *array.shape[1:]), dtype=array.dtype)
+        grown[:self._size] = array[:self._size]
+        return grown
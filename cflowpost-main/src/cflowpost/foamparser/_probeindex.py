@@ -0,0 +1,162 @@
+import os
+import numpy as np
+from ._probeparsers import (OpenFOAMProbeParser,
+                            split_probe_header,
+                            tokenize_probe_lines)
+from ._probecache import probe_fingerprint
+
+DEFAULT_INDEX_STRIDE = 1000
+
+
+class ProbeRowIndex:
+    """Sparse index mapping time instants to byte offsets in a probe file.
+
+    Every `stride`-th data row is indexed, so a time window can be located
+    with a binary search and read by seeking directly into the file instead
+    of tokenizing every previous row.
+
+    Instance attributes:
+
+    self.times -- time instant of every indexed row
+    self.offsets -- byte offset of every indexed row
+    self.data_end -- byte offset where the last complete row ends
+    self.fingerprint -- `probe_fingerprint` of the indexed file
+    """
+
+    def __init__(self, times, offsets, data_end, fingerprint):
+        self.times = np.asarray(times, dtype=float)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.data_end = int(data_end)
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def build(cls, probe_file, stride=DEFAULT_INDEX_STRIDE):
+        """Scan a probe file once, recording every `stride`-th data row.
+
+        Only the time column of the indexed rows is converted to float.
+        """
+        fingerprint = probe_fingerprint(probe_file)
+        times = []
+        offsets = []
+        offset = 0
+        row = 0
+        with open(probe_file, "rb") as f:
+            for line in f:
+                line_start = offset
+                offset += len(line)
+                if line.startswith(b"#") or not line.strip():
+                    continue
+                if not line.endswith(b"\n"):
+                    # Row still being written.
+                    offset = line_start
+                    break
+                if row % stride == 0:
+                    times.append(float(line.split(None, 1)[0]))
+                    offsets.append(line_start)
+                row += 1
+        return cls(times, offsets, offset, fingerprint)
+
+    @classmethod
+    def load(cls, index_file):
+        with np.load(index_file) as index:
+            return cls(index["times"], index["offsets"],
+                       index["data_end"], str(index["fingerprint"]))
+
+    def save(self, index_file):
+        # Written through a file object, np.savez would append ".npz".
+        with open(index_file, "wb") as f:
+            np.savez(f, times=self.times, offsets=self.offsets,
+                     data_end=self.data_end, fingerprint=self.fingerprint)
+
+    def byte_range(self, t_start=None, t_end=None):
+        """Byte range containing every row with t_start <= t <= t_end."""
+        if not len(self.offsets):
+            return self.data_end, self.data_end
+        start = self.offsets[0]
+        end = self.data_end
+        if t_start is not None:
+            i = np.searchsorted(self.times, t_start, side="right") - 1
+            start = self.offsets[max(i, 0)]
+        if t_end is not None:
+            j = np.searchsorted(self.times, t_end, side="right")
+            if j < len(self.offsets):
+                end = self.offsets[j]
+        return int(start), int(end)
+
+
+def row_index_file(probe_file):
+    """Path of the sidecar file storing the row index of a probe file."""
+    probe_dir, probe_name = os.path.split(os.path.abspath(probe_file))
+    return os.path.join(probe_dir, f".{probe_name}.rowindex.npz")
+
+
+def get_row_index(probe_file, stride=DEFAULT_INDEX_STRIDE):
+    """Load the sidecar row index of a probe file, (re)building it if it is
+    missing or the probe file changed since it was built."""
+    index_file = row_index_file(probe_file)
+    fingerprint = probe_fingerprint(probe_file)
+    if os.path.isfile(index_file):
+        try:
+            index = ProbeRowIndex.load(index_file)
+        except (OSError, ValueError, KeyError):
+            index = None
+        if index is not None and index.fingerprint == fingerprint:
+            return index
+    index = ProbeRowIndex.build(probe_file, stride)
+    try:
+        index.save(index_file)
+    except OSError:
+        # Read-only case directory, the index is simply not persisted.
+        pass
+    return index
+
+
+def parse_probe_selection(probe_file, parser: OpenFOAMProbeParser,
+                          probes=None, t_start=None, t_end=None,
+                          index_stride=DEFAULT_INDEX_STRIDE):
+    """Parse only some probes and/or a time window of a probe file.
+
+    Time windows are located with the sidecar `ProbeRowIndex`, built on
+    first use, and only the columns of the requested probes are converted.
+
+    Returns
+    -------
+    times : np.ndarray
+        Array of shape (n_times,) with t_start <= times <= t_end.
+    values : np.ndarray
+        Array of shape (n_times, len(probes), n_components).
+    header_lines : List[str]
+        Header of the probe file.
+    """
+    with open(probe_file) as f:
+        header_lines, _ = split_probe_header(f)
+    probe_count = len(parser._get_probe_positions_from_header(header_lines))
+    if probes is None:
+        probes = range(probe_count)
+    probes = list(probes)
+    usecols = parser.probe_columns(probes)
+    if t_start is None and t_end is None:
+        with open(probe_file) as f:
+            _, data_lines = split_probe_header(f)
+            table = tokenize_probe_lines(data_lines, usecols=usecols)
+    else:
+        index = get_row_index(probe_file, index_stride)
+        start, end = index.byte_range(t_start, t_end)
+        with open(probe_file, "rb") as f:
+            f.seek(start)
+            window_lines = f.read(end - start).decode().splitlines()
+        table = tokenize_probe_lines(window_lines, usecols=usecols)
+        table = table[_time_window_mask(table, t_start, t_end)]
+    times, values = parser._split_table(table, len(probes))
+    return times, values, header_lines
+
+
+def _time_window_mask(table, t_start, t_end):
+    mask = np.ones(len(table), dtype=bool)
+    if not table.size:
+        return mask
+    if t_start is not None:
+        mask &= table[:, 0] >= t_start
+    if t_end is not None:
+        mask &= table[:, 0] <= t_end
+    return mask
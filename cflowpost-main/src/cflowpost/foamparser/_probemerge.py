@@ -0,0 +1,126 @@
+import os
+import glob
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from ._probeparsers import get_probe_parser
+from ._probecache import ProbeCache
+
+
+def find_restart_probe_files(case_dir, field, probes_name="probes"):
+    """Return the probe files of `field` written after every (re)start of a
+    case, sorted by their start time, i.e.
+    `postProcessing/<probes_name>/<startTime>/<field>`."""
+    pattern = os.path.join(case_dir, "postProcessing", probes_name, "*",
+                           field)
+    probe_files = [probe_file for probe_file in glob.glob(pattern)
+                   if _is_number(_start_time_dir(probe_file))]
+    return sorted(probe_files,
+                  key=lambda probe_file: float(_start_time_dir(probe_file)))
+
+
+def splice_probe_arrays(times_list, values_list):
+    """Splice the arrays of consecutive restarts into one monotonic series.
+
+    Restarts are expected in the order they were run. Whenever the time
+    ranges overlap the later restart wins, i.e. every series is cut right
+    before the first time instant written by any of the following restarts.
+    Since each time array is sorted the cut is found with a binary search
+    and the output is filled with a single copy per restart.
+
+    Returns
+    -------
+    times : np.ndarray
+    values : np.ndarray
+    """
+    first_times = np.array([times[0] if len(times) else np.inf
+                            for times in times_list])
+    # Earliest time written by any later restart.
+    cutoffs = np.minimum.accumulate(first_times[::-1])[::-1]
+    cutoffs = np.append(cutoffs[1:], np.inf)
+    keep_counts = [np.searchsorted(times, cutoff, side="left")
+                   for times, cutoff in zip(times_list, cutoffs)]
+    total = sum(keep_counts)
+    values_shape = values_list[-1].shape[1:]
+    times_out = np.empty(total)
+    values_out = np.empty((total, *values_shape))
+    start = 0
+    for times, values, count in zip(times_list, values_list, keep_counts):
+        times_out[start:start + count] = times[:count]
+        values_out[start:start + count] = values[:count]
+        start += count
+    return times_out, values_out
+
+
+def parse_probe_directory(case_dir, field, field_type="vector",
+                          probes_name="probes", max_workers=None,
+                          cache: ProbeCache = None):
+    """Parse the probe files of `field` from every restart of a case and
+    splice them into a single time series.
+
+    The files are parsed in parallel by a process pool and then merged with
+    `splice_probe_arrays`, thus later restarts overwrite overlapping times.
+
+    Parameters
+    ----------
+    case_dir : str
+        Path to the OpenFOAM case.
+    field : str
+        Name of the probed field, e.g. "U" or "p".
+    field_type : str
+        One of "scalar", "vector", "symmTensor" or "tensor".
+    probes_name : str
+        Name of the probes function object.
+    max_workers : int
+        Processes used to parse the files. Defaults to one per CPU.
+    cache : ProbeCache
+        If given, unchanged restart files are loaded from the cache.
+
+    Returns
+    -------
+    times : np.ndarray
+        Array of shape (n_times,), strictly increasing.
+    values : np.ndarray
+        Array of shape (n_times, n_probes, n_components).
+    positions : np.ndarray
+        Array of shape (n_probes, 3), taken from the last restart.
+    """
+    probe_files = find_restart_probe_files(case_dir, field, probes_name)
+    if not probe_files:
+        probes_dir = os.path.join(case_dir, "postProcessing", probes_name)
+        raise FileNotFoundError(f"No probe files for '{field}' found in "
+                                f"{probes_dir}.")
+    args = [(probe_file, field_type, cache) for probe_file in probe_files]
+    if len(probe_files) == 1 or max_workers == 1:
+        results = list(map(_parse_probe_file, args))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_parse_probe_file, args))
+    times_list, values_list, positions_list = zip(*results)
+    times, values = splice_probe_arrays(times_list, values_list)
+    return times, values, positions_list[-1]
+
+
+def _parse_probe_file(args):
+    probe_file, field_type, cache = args
+    if cache is not None:
+        arrays = cache.load(probe_file, field_type)
+        if arrays is not None:
+            return arrays
+    parser = get_probe_parser(field_type)
+    with open(probe_file) as f:
+        arrays = parser.parse_probe_to_arrays(f)
+    if cache is not None:
+        cache.store(probe_file, arrays, field_type)
+    return arrays
+
+
+def _start_time_dir(probe_file):
+    return os.path.basename(os.path.dirname(probe_file))
+
+
+def _is_number(string):
+    try:
+        float(string)
+    except ValueError:
+        return False
+    return True
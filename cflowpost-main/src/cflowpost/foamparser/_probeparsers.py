@@ -1,6 +1,52 @@
-import pandas as pd
+import io
+import warnings
+import itertools
 import numpy as np
-from abc import ABC, abstractmethod
+from abc import ABC
+from ._probedataset import ProbeDataset
+
+_PARENTHESES_TABLE = str.maketrans("()", "  ")
+DEFAULT_CHUNK_ROWS = 10000
+# Bump whenever the parsed output changes, it invalidates cached probes.
+PARSER_VERSION = "1"
+
+
+def split_probe_header(probe_lines):
+    """Consume the commented header of a probe file.
+
+    Only the leading '#' lines are read, so `probe_lines` may be an open
+    file object and the data rows are never held in memory at once.
+
+    Returns the header lines and an iterator over the remaining data lines.
+    """
+    probe_lines = iter(probe_lines)
+    header_lines = []
+    for line in probe_lines:
+        if line.startswith("#"):
+            header_lines.append(line)
+            continue
+        return header_lines, itertools.chain([line], probe_lines)
+    return header_lines, iter(())
+
+
+def tokenize_probe_lines(probe_lines, max_rows=None, usecols=None):
+    """Convert the data rows of a probe file into a 2D float array.
+
+    The parentheses enclosing each vector/tensor are replaced by blanks
+    on the fly and the resulting whitespace separated table is handed to
+    numpy's C tokenizer, i.e. no Python level float conversion takes place.
+
+    The first column of the returned array holds the time instants and the
+    remaining ones the flattened probe components. If `usecols` is given
+    only those columns are converted to floats.
+    """
+    stripped_lines = (line.translate(_PARENTHESES_TABLE)
+                      for line in probe_lines)
+    with warnings.catch_warnings():
+        # An empty table is a valid result, e.g. a freshly started run.
+        warnings.filterwarnings("ignore", message="loadtxt: input contained")
+        return np.loadtxt(stripped_lines, comments="#", ndmin=2,
+                          max_rows=max_rows, usecols=usecols)
 
 
 class OpenFOAMProbeParser(ABC):
@@ -25,11 +71,135 @@ class OpenFOAMProbeParser(ABC):
     0.000203003             (-0.0022293 -0.00449709 2.22242)             (-0.0030485 0.00505502 1.35891)             (0.00241385 -0.0312633 7.81685)             (0.0751307 -2.37652 4.19252)             (-0.120717 1.81705 6.00923)
     0.000305047             (-0.00204538 -0.0036662 2.23392)             (-0.00304933 0.00511356 1.36711)             (0.00318765 -0.0303157 7.82468)             (0.0754719 -2.47068 4.23277)             (-0.121444 1.82007 6.05034)
     ```
+
+    Subclasses only differ in the amount of components stored per probe
+    (`n_components`), the whole table is tokenized in bulk by
+    `tokenize_probe_lines`.
+
+    Class attributes:
+
+    n_components -- components per probe, i.e. 1, 3, 6 or 9
+    components -- suffixes of the components in the returned order
+    component_order -- column order of the components in the probe file
+                       relative to `components`, None if they match
+    field_name -- default name used to label the legacy dataframes
     """
+    n_components: int = 1
+    components: tuple = ("",)
+    component_order: tuple = None
+    field_name: str = ""
+
+    def __init__(self, field_name=None):
+        if field_name is not None:
+            self.field_name = field_name
 
-    @abstractmethod
     def parse_probe_to_dfs(self, probe_contents):
-        pass
+        """Parse a probe file into a dictionary of dataframes, one per probe,
+        and a dictionary of probe positions.
+
+        The dataframes are built on top of the array returned by
+        `parse_probe_to_arrays`, which should be preferred for large files.
+        """
+        header_lines, data_lines = split_probe_header(
+            self._as_lines(probe_contents))
+        probe_positions = self._get_probe_positions_from_header(header_lines)
+        table = tokenize_probe_lines(data_lines)
+        times, values = self._split_table(table, len(probe_positions))
+        dataset = self.to_dataset(times, values)
+        return dataset.to_dataframes(), probe_positions
+
+    def parse_probe_to_dataset(self, probe_contents) -> ProbeDataset:
+        """Parse a probe file into a `ProbeDataset`."""
+        return self.to_dataset(*self.parse_probe_to_arrays(probe_contents))
+
+    def to_dataset(self, times, values, positions=None,
+                   probe_ids=None) -> ProbeDataset:
+        """Wrap parsed arrays into a `ProbeDataset` labelled after this
+        parser's field name and components."""
+        return ProbeDataset(times=times, values=values, positions=positions,
+                            probe_ids=probe_ids, field_name=self.field_name,
+                            components=self.__class__.components)
+
+    def probe_columns(self, probes):
+        """Table columns holding the time and the components of `probes`."""
+        n_components = self.__class__.n_components
+        probes = np.asarray(probes, dtype=int).reshape(-1, 1)
+        component_columns = 1 + probes*n_components + np.arange(n_components)
+        return [0, *component_columns.ravel().tolist()]
+
+    def parse_probe_to_arrays(self, probe_contents):
+        """Parse a probe file into numpy arrays.
+
+        Parameters
+        ----------
+        probe_contents : str or Iterable[str]
+            Contents of the probe file or an iterable over its lines,
+            e.g. an open file object.
+
+        Returns
+        -------
+        times : np.ndarray
+            Array of shape (n_times,).
+        values : np.ndarray
+            Contiguous array of shape (n_times, n_probes, n_components).
+        positions : np.ndarray
+            Array of shape (n_probes, 3) with the probe locations.
+        """
+        header_lines, data_lines = split_probe_header(
+            self._as_lines(probe_contents))
+        positions = self._get_probe_position_array(header_lines)
+        table = tokenize_probe_lines(data_lines)
+        times, values = self._split_table(table, len(positions))
+        return times, values, positions
+
+    def iter_probe_arrays(self, probe_contents,
+                          chunk_rows=DEFAULT_CHUNK_ROWS):
+        """Lazily parse a probe file in blocks of at most `chunk_rows` rows.
+
+        The header is consumed once and only one block of lines is held in
+        memory at any time, thus the memory footprint does not depend on the
+        length of the file.
+
+        Yields
+        ------
+        times : np.ndarray
+            Array of shape (n_rows,).
+        values : np.ndarray
+            Contiguous array of shape (n_rows, n_probes, n_components).
+        """
+        _, data_lines = split_probe_header(self._as_lines(probe_contents))
+        while True:
+            chunk_lines = list(itertools.islice(data_lines, chunk_rows))
+            if not chunk_lines:
+                return
+            table = tokenize_probe_lines(chunk_lines)
+            if table.size:
+                yield self._split_table(table)
+
+    def parse_probe_positions(self, probe_contents):
+        """Return the (n_probes, 3) array of probe locations, reading only
+        the header of the probe file."""
+        header_lines, _ = split_probe_header(self._as_lines(probe_contents))
+        return self._get_probe_position_array(header_lines)
+
+    def _split_table(self, table, probe_count=None):
+        """Split a tokenized table into its time and value arrays."""
+        n_components = self.__class__.n_components
+        if not table.size:
+            return (np.empty(0),
+                    np.empty((0, probe_count or 0, n_components)))
+        times = np.ascontiguousarray(table[:, 0])
+        values = table[:, 1:].reshape(len(table), -1, n_components)
+        component_order = self.__class__.component_order
+        if component_order is not None:
+            values = values[..., list(component_order)]
+        return times, np.ascontiguousarray(values)
+
+    @staticmethod
+    def _as_lines(probe_contents):
+        if isinstance(probe_contents, str):
+            return io.StringIO(probe_contents)
+        return probe_contents
 
     def _count_probes(self, probe_contents):
         """Counts the probes present in the probe file.
@@ -45,12 +215,16 @@ class OpenFOAMProbeParser(ABC):
 
     @staticmethod
     def _get_header_lines(probe_contents):
-        return list(filter(lambda line: "#" == line[0],
-                           probe_contents.splitlines()))
+        header_lines, _ = split_probe_header(
+            OpenFOAMProbeParser._as_lines(probe_contents))
+        return [line.rstrip("\n") for line in header_lines]
 
     def _get_probe_positions(self, probe_contents):
-        positions = {}
         header_lines = self._get_header_lines(probe_contents)
+        return self._get_probe_positions_from_header(header_lines)
+
+    def _get_probe_positions_from_header(self, header_lines):
+        positions = {}
         for probe_number, line in enumerate(header_lines):
             if '(' in line:
                 probe_position = self._get_probe_position(line)
@@ -59,6 +233,12 @@ class OpenFOAMProbeParser(ABC):
                 break
         return positions
 
+    def _get_probe_position_array(self, header_lines):
+        positions = self._get_probe_positions_from_header(header_lines)
+        position_table = " ".join(positions.values())
+        position_table = position_table.translate(_PARENTHESES_TABLE)
+        return np.array(position_table.split(), dtype=float).reshape(-1, 3)
+
     @staticmethod
     def _get_probe_position(line):
         pos_start_index = line.find('(')
@@ -72,9 +252,10 @@ class OpenFOAMProbeParser(ABC):
 
 
 class OpenFOAMScalarProbeParser(OpenFOAMProbeParser):
-
-    def parse_probe_to_dfs(self, probe_contents):
-        raise NotImplementedError
+    """Parser for scalar probe files, e.g. `p` or `k`."""
+    n_components = 1
+    components = ("",)
+    field_name = "p"
 
 
 class OpenFOAMVectorProbeParser(OpenFOAMProbeParser):
@@ -85,87 +266,9 @@ class OpenFOAMVectorProbeParser(OpenFOAMProbeParser):
     It inherits from the `ProbeParser` class, which serves as the base
     for the parser of either scalar, vectorial or tensorial quantities.
     """
-
-    def parse_probe_to_dfs(self, probe_contents):
-        probe_lines = self._format_probe_into_lines(probe_contents)
-        probe_count = self._count_probes(probe_contents)
-        probe_positions = self._get_probe_positions(probe_contents)
-        datapoints_list = self.__extract_datapoints(probe_lines, probe_count)
-        nested_u_dict = self.__get_u_dictionary(datapoints_list, probe_count)
-        return self.__get_u_dataframes(nested_u_dict), probe_positions
-
-    def __get_u_dictionary(self, datapoints_list, probe_count):
-        # This method returns a nested dictionary containing the velocity
-        # components of each probe.
-        # Each inner dictionary will be used to construct a dataframe
-        u_dict = {}
-        for i in range(probe_count):
-            u_dict[f'U_{i}'] = {'Time': [], 'Ux': [], 'Uy': [], 'Uz': []}
-            ui_dict = u_dict[f'U_{i}']
-            for data_point in datapoints_list:
-                timepoint = float(data_point[0])
-                ui_dict['Time'].append(timepoint)
-                u = self.convert_openfoam_vector_to_array(data_point[i + 1])
-                u_dict[f'U_{i}'] = self.add_vector_to_comps_dict(u, ui_dict)
-        return u_dict
-
-    @staticmethod
-    def __get_u_dataframes(nested_u_dict):
-        """Returns a dictionary of dataframes.
-
-        Each key represents a velocity component.
-
-        Each dataframe contains the transient data for one velocity component.
-
-        The dataframes correspond to ONLY ONE PROBE DATASET."""
-        return {f"U_{i}": pd.DataFrame(nested_u_dict[u_probe])
-                for i, u_probe in enumerate(nested_u_dict)}
-
-    def __extract_datapoints(self, probe_lines, probe_count):
-        probe_lines = [line.strip() for line in probe_lines]
-        data_points_list = [self.__extract_datapoint(line, probe_count)
-                            for line in probe_lines if "#" not in line]
-        return data_points_list
-
-    @staticmethod
-    def __extract_datapoint(line: str, probe_count):
-        """This method returns the data point associated to a single
-        line in the form of a list.
-
-        The length of this list depends upon the number of probes.
-
-        Thus this method should work with any amount of probes."""
-
-        "Get the index of the first blank space."
-        time_index = line.find(' ')
-
-        "The time instant is contained from the first character until the first space"
-        time_point = line[0:time_index]
-
-        "Initialize a list for the data points"
-        data_points = []
-
-        "The data points should be searched starting from the first blank space"
-        data_point_start_search = time_index
-
-        for _ in range(probe_count):
-            "Each vector is contained in between parentheses"
-            "Find the first '(' after the start_search index"
-            data_point_start_index = line.find('(', data_point_start_search)
-
-            "Find the closing parenthesis"
-            data_point_end_index = line.find(')', data_point_start_search + 1)
-
-            "Slice the vector contained between the found parentheses"
-            data_point = line[data_point_start_index:data_point_end_index + 1]
-
-            "Append the data point to the list"
-            data_points.append(data_point)
-            "Update the start_search index for the next loop"
-            data_point_start_search = data_point_end_index
-        "Create a list which will serve as the row in the DataFrame"
-        data_string_list = [time_point, *data_points]
-        return data_string_list
+    n_components = 3
+    components = ("x", "y", "z")
+    field_name = "U"
 
     @staticmethod
     def parse_vector():
@@ -173,19 +276,64 @@ class OpenFOAMVectorProbeParser(OpenFOAMProbeParser):
 
     @staticmethod
     # This function returns an array of vector components in float
-    # Its output is the input of the add_vector_to_comps_dict
     def convert_openfoam_vector_to_array(of_vector_str):
         of_vector_str = of_vector_str.strip('()')
-        of_vector_comps = of_vector_str.split(' ')
-        counter = 0
-        for comp in of_vector_comps:
-            of_vector_comps[counter] = float(comp)
-            counter += 1
-        return np.array(of_vector_comps)
+        return np.array(of_vector_str.split(), dtype=float)
 
-    @staticmethod
-    def add_vector_to_comps_dict(vector, comp_dict):
-        comp_dict['Ux'].append(vector[0])
-        comp_dict['Uy'].append(vector[1])
-        comp_dict['Uz'].append(vector[2])
-        return comp_dict
+
+class OpenFOAMSymmTensorProbeParser(OpenFOAMProbeParser):
+    """Parser for symmTensor probe files, e.g. `UPrime2Mean`.
+
+    OpenFOAM writes the components as (xx xy xz yy yz zz), they are
+    returned in the order used by `datatypes.SymmetricCartesianTensorStack`,
+    i.e. (xx yy zz xy yz xz), so `values[:, i]` can be fed to it directly.
+    """
+    n_components = 6
+    components = ("xx", "yy", "zz", "xy", "yz", "xz")
+    component_order = (0, 3, 5, 1, 4, 2)
+    field_name = "UPrime2Mean"
+
+
+class OpenFOAMTensorProbeParser(OpenFOAMProbeParser):
+    """Parser for tensor probe files, e.g. `grad(U)`.
+
+    Components are kept in OpenFOAM's row-major order, thus
+    `values.reshape(n_times, n_probes, 3, 3)` yields the full tensors.
+    """
+    n_components = 9
+    components = ("xx", "xy", "xz", "yx", "yy", "yz", "zx", "zy", "zz")
+    field_name = "gradU"
+
+
+PROBE_PARSERS = {"scalar": OpenFOAMScalarProbeParser,
+                 "vector": OpenFOAMVectorProbeParser,
+                 "symmTensor": OpenFOAMSymmTensorProbeParser,
+                 "tensor": OpenFOAMTensorProbeParser}
+
+
+def get_probe_parser(field_type, field_name=None) -> OpenFOAMProbeParser:
+    """Instantiate the parser matching an OpenFOAM field type, i.e. one of
+    "scalar", "vector", "symmTensor" or "tensor"."""
+    try:
+        parser_cls = PROBE_PARSERS[field_type]
+    except KeyError:
+        raise ValueError(f"Unknown probe field type '{field_type}'. "
+                         f"Expected one of {list(PROBE_PARSERS)}.")
+    return parser_cls(field_name=field_name)
+
+
+def infer_probe_field_type(probe_contents):
+    """Infer the field type of a probe file from its first data row, i.e.
+    from the amount of components enclosed by the first parentheses."""
+    _, data_lines = split_probe_header(
+        OpenFOAMProbeParser._as_lines(probe_contents))
+    first_line = next(data_lines, "")
+    if "(" not in first_line:
+        return "scalar"
+    first_value = first_line[first_line.find("(") + 1:first_line.find(")")]
+    n_components = len(first_value.split())
+    for field_type, parser_cls in PROBE_PARSERS.items():
+        if parser_cls.n_components == n_components:
+            return field_type
+    raise ValueError(f"Unexpected probe value with {n_components} "
+                     f"components: ({first_value}).")
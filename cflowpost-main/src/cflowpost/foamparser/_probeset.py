@@ -0,0 +1,138 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Mapping, Sequence, Union
+from ._probeparsers import get_probe_parser, infer_probe_field_type
+from ._probecache import ProbeCache
+
+
+@dataclass
+class ProbeSet:
+    """Several probed fields sharing a common time axis.
+
+    Attributes:
+
+    times -- (n_times,) array shared by every field
+    fields -- mapping from field name to its
+              (n_times, n_probes, n_components) array
+    positions -- mapping from field name to its (n_probes, 3) array
+    """
+    times: np.ndarray
+    fields: Dict[str, np.ndarray] = field(default_factory=dict)
+    positions: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def __getitem__(self, field_name):
+        return self.fields[field_name]
+
+
+def join_on_time(times_mapping: Mapping[str, np.ndarray]):
+    """Inner join of sorted time arrays.
+
+    Returns the common time instants and, for every key, the indices of
+    those instants within its own time array.
+    """
+    common_times = None
+    for times in times_mapping.values():
+        if common_times is None:
+            common_times = times
+            continue
+        common_times = np.intersect1d(common_times, times,
+                                      assume_unique=True)
+    indices = {key: np.searchsorted(times, common_times)
+               for key, times in times_mapping.items()}
+    return common_times, indices
+
+
+def parse_probe_set(paths: Union[Sequence[str], Mapping[str, str]],
+                    field_types: Mapping[str, str] = None,
+                    max_workers=None,
+                    cache: ProbeCache = None) -> ProbeSet:
+    """Parse several probe files in a process pool and join them on their
+    common time instants.
+
+    Workers do not send the parsed arrays back through pickling. Every file
+    is written into a `ProbeCache` as `.npy` files and the parent process
+    only opens them as memory maps to join them. Without an explicit cache a
+    temporary one is used and removed afterwards. Eviction of an explicit
+    cache waits until every field has been joined, so no worker removes
+    an entry the parent has still to open.
+
+    Parameters
+    ----------
+    paths : Sequence[str] or Mapping[str, str]
+        Probe files to parse. If a sequence is given the file names, e.g.
+        "U" or "p", are used as field names.
+    field_types : Mapping[str, str]
+        Field type of each field name, e.g. {"p": "scalar"}. Missing ones
+        are inferred from the first row of the probe file.
+    max_workers : int
+        Processes used to parse the files. Defaults to one per CPU.
+    cache : ProbeCache
+        Cache used to exchange the arrays, unchanged files are not parsed
+        again.
+
+    Returns
+    -------
+    ProbeSet
+    """
+    paths = _name_probe_files(paths)
+    field_types = dict(field_types or {})
+    for field_name, probe_file in paths.items():
+        if field_name not in field_types:
+            with open(probe_file) as f:
+                field_types[field_name] = infer_probe_field_type(f)
+    temp_dir = None
+    if cache is None:
+        temp_dir = tempfile.mkdtemp(prefix="probeset")
+        cache = ProbeCache(cache_dir=temp_dir, max_bytes=np.inf)
+    try:
+        args = [(probe_file, field_types[field_name], cache)
+                for field_name, probe_file in paths.items()]
+        if len(args) == 1 or max_workers == 1:
+            list(map(_cache_probe_file, args))
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(_cache_probe_file, args))
+        arrays = {field_name: cache.load(probe_file, field_types[field_name])
+                  for field_name, probe_file in paths.items()}
+        times, indices = join_on_time({field_name: field_arrays[0]
+                                       for field_name, field_arrays
+                                       in arrays.items()})
+        fields = {field_name: field_arrays[1][indices[field_name]]
+                  for field_name, field_arrays in arrays.items()}
+        positions = {field_name: np.array(field_arrays[2])
+                     for field_name, field_arrays in arrays.items()}
+        if temp_dir is None:
+            cache.evict()
+    finally:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    return ProbeSet(times=np.array(times), fields=fields, positions=positions)
+
+
+def _cache_probe_file(args):
+    probe_file, field_type, cache = args
+    if cache.load(probe_file, field_type) is not None:
+        return
+    parser = get_probe_parser(field_type)
+    with open(probe_file) as f:
+        arrays = parser.parse_probe_to_arrays(f)
+    # Evicted by the parent once every entry has been loaded.
+    cache.store(probe_file, arrays, field_type, evict=False)
+
+
+def _name_probe_files(paths):
+    if isinstance(paths, Mapping):
+        return dict(paths)
+    named_paths = {}
+    for probe_file in paths:
+        field_name = os.path.basename(probe_file)
+        if field_name in named_paths:
+            raise ValueError(f"Field '{field_name}' is probed by several "
+                             f"files, please provide a mapping from field "
+                             f"names to probe files instead.")
+        named_paths[field_name] = probe_file
+    return named_paths
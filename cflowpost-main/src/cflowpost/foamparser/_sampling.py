@@ -0,0 +1,255 @@
+import os
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from typing import Dict, List, Mapping, Sequence, Union
+from scipy.spatial import cKDTree
+from ..pvx import Line, Plane
+from ._polymesh import read_polymesh
+from ._fieldreader import read_openfoam_field
+from ._decomposed import (find_processor_dirs,
+                          read_decomposed_cell_centres,
+                          read_decomposed_field)
+
+Definition = Union[Line, Plane]
+
+
+class CellCentreSampler:
+    """Sample cell data at arbitrary points through a KD-tree over the cell
+    centres of a mesh.
+
+    Queries for many points are answered in a single vectorized tree query,
+    so sampling hundreds of lines costs one call instead of one ParaView
+    filter update per line.
+
+    Instance attributes:
+
+    self.cell_centres -- (n_cells, 3) array the tree is built on
+    self.tree -- `scipy.spatial.cKDTree` over the cell centres
+    """
+
+    def __init__(self, cell_centres, leafsize=16):
+        self.cell_centres = np.asarray(cell_centres)
+        self.tree = cKDTree(self.cell_centres, leafsize=leafsize)
+
+    def query(self, points, method="nearest", k=8, power=2,
+              max_distance=np.inf, workers=-1):
+        """Find the cells and weights used to interpolate at `points`.
+
+        Parameters
+        ----------
+        points : np.ndarray
+            Array of shape (n_points, 3).
+        method : str
+            "nearest" for the value of the nearest cell or "idw" for the
+            inverse distance weighted average of the `k` nearest cells.
+        k : int
+            Neighbours used by "idw".
+        power : float
+            Exponent of the inverse distance weights.
+        max_distance : float
+            Points without any cell centre closer than this get NaN.
+        workers : int
+            Threads used by the tree query, -1 uses every CPU.
+
+        Returns
+        -------
+        cells : np.ndarray
+            Array of shape (n_points, n_neighbours).
+        weights : np.ndarray
+            Array of shape (n_points, n_neighbours), rows add up to 1 or
+            are NaN for points out of reach.
+        """
+        n_neighbours = 1 if method == "nearest" else k
+        if method not in ("nearest", "idw"):
+            raise ValueError(f"Unknown sampling method '{method}'.")
+        distances, cells = self.tree.query(np.asarray(points),
+                                           k=n_neighbours,
+                                           distance_upper_bound=max_distance,
+                                           workers=workers)
+        distances = distances.reshape(len(points), n_neighbours)
+        cells = cells.reshape(len(points), n_neighbours)
+        found = np.isfinite(distances)
+        cells = np.where(found, cells, 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weights = np.where(found, distances**-float(power), 0)
+            exact = distances == 0
+            weights = np.where(exact.any(axis=1, keepdims=True),
+                               exact.astype(float), weights)
+            weights /= weights.sum(axis=1, keepdims=True)
+        return cells, weights
+
+    def sample(self, points, cell_values, **kwargs):
+        """Interpolate `cell_values`, of shape (n_cells, ...), at `points`.
+        See `query` for the keyword arguments."""
+        cells, weights = self.query(points, **kwargs)
+        return self.interpolate(cells, weights, cell_values)
+
+    @staticmethod
+    def interpolate(cells, weights, cell_values):
+        cell_values = np.asarray(cell_values)
+        weights = weights.reshape(*weights.shape,
+                                  *(1,)*(cell_values.ndim - 1))
+        return (cell_values[cells]*weights).sum(axis=1)
+
+
+@lru_cache(maxsize=4)
+def get_case_sampler(case_dir, leafsize=16,
+                     decomposed=False) -> CellCentreSampler:
+    """Read the polyMesh of a case and build its sampler. Results are cached
+    so repeated calls do not rebuild the tree.
+
+    The cell centres of decomposed cases are computed from the processor
+    meshes and ordered as in the reconstructed case."""
+    if decomposed:
+        return CellCentreSampler(read_decomposed_cell_centres(case_dir),
+                                 leafsize=leafsize)
+    mesh = read_polymesh(os.path.join(case_dir, "constant", "polyMesh"))
+    return CellCentreSampler(mesh.cell_centres, leafsize=leafsize)
+
+
+def line_points(line: Line) -> np.ndarray:
+    """Points sampled along a line, `resolution + 1` of them as ParaView's
+    PlotOverLine does."""
+    point1 = np.asarray(line.point1, dtype=float)
+    point2 = np.asarray(line.point2, dtype=float)
+    fractions = np.linspace(0, 1, line.resolution + 1)[:, np.newaxis]
+    return point1 + fractions*(point2 - point1)
+
+
+def plane_points(plane: Plane) -> np.ndarray:
+    """Points sampled on a plane, (x_res + 1)*(y_res + 1) of them as
+    ParaView's Plane source does, varying fastest along point1."""
+    origin = np.asarray(plane.origin, dtype=float)
+    axis1 = np.asarray(plane.point1, dtype=float) - origin
+    axis2 = np.asarray(plane.point2, dtype=float) - origin
+    s1, s2 = np.meshgrid(np.linspace(0, 1, plane.x_res + 1),
+                         np.linspace(0, 1, plane.y_res + 1))
+    return (origin + s1.reshape(-1, 1)*axis1 + s2.reshape(-1, 1)*axis2)
+
+
+def definition_points(definition: Definition) -> np.ndarray:
+    if isinstance(definition, Line):
+        return line_points(definition)
+    return plane_points(definition)
+
+
+def resolve_time_dir(case_dir, timestep):
+    """Return the time directory of a case matching `timestep`, which may
+    also be "latest"."""
+    time_dirs = {}
+    for name in os.listdir(case_dir):
+        try:
+            time_dirs[float(name)] = name
+        except ValueError:
+            continue
+    if not time_dirs:
+        raise FileNotFoundError(f"No time directories found in {case_dir}.")
+    if timestep == "latest":
+        return os.path.join(case_dir, time_dirs[max(time_dirs)])
+    try:
+        return os.path.join(case_dir, time_dirs[float(timestep)])
+    except KeyError:
+        raise FileNotFoundError(f"Time {timestep} not found in {case_dir}.")
+
+
+def sample_definitions(case_dir, definitions: Sequence[Definition],
+                       method="nearest", output_dir=None,
+                       sampler: CellCentreSampler = None,
+                       decomposed=False, max_workers=None,
+                       **kwargs) -> Dict[str, pd.DataFrame]:
+    """Evaluate `pvx` line and plane definitions in process.
+
+    Definitions sharing a timestep are sampled together: every field is read
+    once and the points of all of them are located with a single tree
+    query. Columns follow ParaView's csv export, e.g. "Points_0", "U_0",
+    plus "arc_length" for lines.
+
+    Parameters
+    ----------
+    case_dir : str
+        Path to an OpenFOAM case.
+    definitions : Sequence[Line or Plane]
+        Definitions, e.g. from `pvx.line_definition`.
+    method : str
+        "nearest" or "idw", see `CellCentreSampler.query`.
+    output_dir : str
+        If given, every result is written as csv to `definition.output`
+        relative to this directory, as `pvx.extract` does.
+    sampler : CellCentreSampler
+        Defaults to the cached sampler of the case mesh.
+    decomposed : bool
+        Read the `processorN` directories instead of the reconstructed
+        case, see `read_decomposed_field`.
+    max_workers : int
+        Processes used to read decomposed cases.
+    kwargs :
+        Passed to `CellCentreSampler.query`.
+
+    Returns
+    -------
+    Dict[str, pd.DataFrame]
+        Results keyed by `definition.output`.
+    """
+    if sampler is None:
+        sampler = get_case_sampler(os.path.abspath(case_dir),
+                                   decomposed=decomposed)
+    time_dirs_root = case_dir
+    if decomposed:
+        time_dirs_root = find_processor_dirs(case_dir)[0]
+    results = {}
+    for timestep, group in _group_by_timestep(definitions).items():
+        time_name = os.path.basename(resolve_time_dir(time_dirs_root,
+                                                      timestep))
+        points_list = [definition_points(definition) for definition in group]
+        cells, weights = sampler.query(np.concatenate(points_list),
+                                       method=method, **kwargs)
+        splits = np.cumsum([len(points) for points in points_list])[:-1]
+        variables = sorted({variable for definition in group
+                            for variable in definition.variables})
+        fields = {variable: _read_internal_field(
+                      case_dir, time_name, variable, decomposed, max_workers,
+                      n_cells=len(sampler.cell_centres))
+                  for variable in variables}
+        for definition, points, def_cells, def_weights in zip(
+                group, points_list, np.split(cells, splits),
+                np.split(weights, splits)):
+            columns = {f"Points_{i}": points[:, i] for i in range(3)}
+            if isinstance(definition, Line):
+                columns["arc_length"] = np.linalg.norm(points - points[0],
+                                                       axis=1)
+            for variable in definition.variables:
+                values = sampler.interpolate(def_cells, def_weights,
+                                             fields[variable])
+                columns.update(_variable_columns(variable, values))
+            results[definition.output] = pd.DataFrame(columns)
+    if output_dir is not None:
+        for output, df in results.items():
+            output_file = os.path.join(output_dir, output)
+            os.makedirs(os.path.dirname(output_file), exist_ok=True)
+            df.to_csv(output_file, index=False)
+    return results
+
+
+def _read_internal_field(case_dir, time_name, variable, decomposed,
+                         max_workers, n_cells):
+    if decomposed:
+        return read_decomposed_field(case_dir, time_name, variable,
+                                     max_workers=max_workers).internal_field
+    # Uniform fields are broadcast to every cell, as per processor in the
+    # decomposed case.
+    return read_openfoam_field(os.path.join(case_dir, time_name, variable),
+                               n_cells=n_cells).internal_field
+
+
+def _group_by_timestep(definitions) -> Mapping[str, List[Definition]]:
+    groups = {}
+    for definition in definitions:
+        groups.setdefault(definition.timestep, []).append(definition)
+    return groups
+
+
+def _variable_columns(variable, values):
+    if values.ndim == 1:
+        return {variable: values}
+    return {f"{variable}_{i}": values[:, i] for i in range(values.shape[1])}
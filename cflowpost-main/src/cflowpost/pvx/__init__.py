@@ -37,8 +37,9 @@ def csv_source(csv_file, x_col, y_col, z_col):
                                          z_col=z_col)
 
 
-def openfoam_source(case_path):
-    return configbuilder.OpenFOAMSourceConfig(case_path=case_path)
+def openfoam_source(case_path, decomposed=False):
+    return configbuilder.OpenFOAMSourceConfig(case_path=case_path,
+                                              decomposed=decomposed)
 
 
 def line_definition(point1: Point, point2: Point,
@@ -14,6 +14,10 @@ def parse_args():
     source_group.add_argument("--csv-source",
                               help="Flag if reading csv file",
                               action="store_true")
+    parser.add_argument("--decomposed",
+                        help="Flag if the openfoam case is decomposed, "
+                             "i.e. read the processor directories.",
+                        action="store_true")
     parser.add_argument("--vtk-source",
                         help="Flag if reading vtk file",
                         action="store_true")
@@ -91,11 +95,13 @@ def read_config(config_json=None, **kwargs):
         return json.loads(f.read(), **kwargs)
 
 
-def read_openfoam_case(source_file):
+def read_openfoam_case(source_file, decomposed=False):
     from paraview.simple import OpenFOAMReader
     print(f"Reading OpenFOAM source from {source_file}")
     case_source = OpenFOAMReader(registrationName='foam',
                                  FileName=source_file)
+    if decomposed:
+        case_source.CaseType = "Decomposed Case"
     case_source.MeshRegions = ["internalMesh"]
     return case_source
 
@@ -213,7 +219,8 @@ def main():
     start_time = time.perf_counter()
     print("Loading data")
     if args.openfoam_source:
-        source = read_openfoam_case(args.path_to_source)
+        source = read_openfoam_case(args.path_to_source,
+                                    decomposed=args.decomposed)
     elif args.csv_source:
         source = read_csv_source(args.path_to_source,
                                  x_col=args.x_col,
@@ -13,9 +13,13 @@ class SourceConfig(ABC):
 @dataclass
 class OpenFOAMSourceConfig(SourceConfig):
     case_path: str
+    decomposed: bool = False
 
     def cmd_options(self):
-        return f"--openfoam-source -p {self.case_path}"
+        options = f"--openfoam-source -p {self.case_path}"
+        if self.decomposed:
+            options += " --decomposed"
+        return options
 
 
 @dataclass
@@ -1,6 +1,19 @@
 from scipy import signal as _signal
 import matplotlib.pyplot as _plt
+import matplotlib.colors as _colors
 import numpy as _np
+from ._welch import (WelchPSD,
+                     DEFAULT_CHUNK_SERIES,
+                     compute_batched_welch_psd)
+from ._welchaccumulator import WelchAccumulator
+from ._resampling import effective_sampling_rate, resample_uniform
+from ._crossspectral import (CrossSpectralMatrix,
+                             DEFAULT_FREQUENCY_BLOCK,
+                             cross_spectral_matrix)
+from ._spod import SPOD, SPODResult, DEFAULT_N_MODES, read_csv_snapshots
+from ._spectrogram import (Spectrogram,
+                           ChunkedSpectrogram,
+                           compute_chunked_spectrogram)
 
 
 def compute_welch_psd(time_series, sampling_rate, **kwargs):
@@ -14,3 +27,15 @@ def plot_periodogram(f, pxx, y_min, y_max, ax=None):
     ax.set_ylim(y_min, y_max)
     ax.grid("both")
     return ax
+
+
+def plot_spectrogram(t, f, sxx, v_min=None, v_max=None, ax=None,
+                     cmap="viridis"):
+    if ax is None:
+        fig, ax = _plt.subplots(1, 1)
+    mesh = ax.pcolormesh(t, f, sxx, shading="auto", cmap=cmap,
+                         norm=_colors.LogNorm(vmin=v_min, vmax=v_max))
+    ax.figure.colorbar(mesh, ax=ax)
+    ax.set_xlabel("t")
+    ax.set_ylabel("f")
+    return ax
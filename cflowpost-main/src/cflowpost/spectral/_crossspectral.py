@@ -0,0 +1,139 @@
+import numpy as np
+from dataclasses import dataclass
+from typing import Tuple
+from scipy import signal
+from ._segments import (split_segments,
+                        segment_spectra,
+                        spectral_scale,
+                        one_sided_scales)
+
+DEFAULT_FREQUENCY_BLOCK = 64
+
+
+@dataclass
+class CrossSpectralMatrix:
+    """Cross spectral densities between every pair of probes.
+
+    Attributes:
+
+    frequencies -- (n_frequencies,) array of sample frequencies
+    csd -- (n_frequencies, n_probes, n_probes) Hermitian array, or
+           (n_frequencies, n_pairs) if only the upper triangle was kept
+    pairs -- row and column probe indices of every pair of a packed
+             upper triangle, None for full matrices
+    """
+    frequencies: np.ndarray
+    csd: np.ndarray
+    pairs: Tuple[np.ndarray, np.ndarray] = None
+
+    @property
+    def n_probes(self):
+        if self.pairs is None:
+            return self.csd.shape[-1]
+        return int(self.pairs[0].max()) + 1
+
+    def auto_spectra(self) -> np.ndarray:
+        """(n_frequencies, n_probes) PSD of every probe, the diagonal."""
+        if self.pairs is None:
+            return np.diagonal(self.csd, axis1=1, axis2=2).real
+        rows, cols = self.pairs
+        return self.csd[:, rows == cols].real
+
+    def coherence(self) -> np.ndarray:
+        """Magnitude squared coherence |Pxy|**2/(Pxx*Pyy), in the same
+        layout as `csd`."""
+        auto_spectra = self.auto_spectra()
+        if self.pairs is None:
+            normalization = (auto_spectra[:, :, np.newaxis]
+                             * auto_spectra[:, np.newaxis, :])
+        else:
+            rows, cols = self.pairs
+            normalization = auto_spectra[:, rows]*auto_spectra[:, cols]
+        return np.abs(self.csd)**2/normalization
+
+    def to_full(self) -> np.ndarray:
+        """(n_frequencies, n_probes, n_probes) Hermitian CSD array."""
+        if self.pairs is None:
+            return self.csd
+        rows, cols = self.pairs
+        full = np.empty((len(self.frequencies), self.n_probes,
+                         self.n_probes), dtype=self.csd.dtype)
+        full[:, cols, rows] = self.csd.conj()
+        full[:, rows, cols] = self.csd
+        return full
+
+
+def cross_spectral_matrix(probe_array, fs, nperseg=256, noverlap=None,
+                          window="hann", detrend="constant",
+                          scaling="density", upper_triangle=False,
+                          frequency_band=None,
+                          frequency_block=DEFAULT_FREQUENCY_BLOCK
+                          ) -> CrossSpectralMatrix:
+    """Welch estimate of the cross spectral density of every probe pair.
+
+    Every segment of every probe is Fourier transformed once. The CSD of a
+    block of frequencies is then obtained for all pairs and segments at
+    once with a single einsum, i.e. a batched matrix product, instead of
+    one `scipy.signal.csd` call per pair. Entries match `scipy.signal.csd`
+    with the same arguments, `csd[f, i, j]` being the CSD of probes i and j.
+
+    Parameters
+    ----------
+    probe_array : np.ndarray
+        Array of shape (n_times, n_probes), e.g. a single component of a
+        probe dataset, see `ProbeDataset.component`.
+    fs : float
+        Sampling frequency.
+    nperseg, noverlap, window, detrend, scaling :
+        As in `scipy.signal.csd`, detrend may be "constant", "linear" or
+        False.
+    upper_triangle : bool
+        Keep only the pairs i <= j, halving the memory of the result.
+    frequency_band : Tuple[float, float]
+        Keep only the frequencies f_min <= f <= f_max.
+    frequency_block : int
+        Frequencies handled per einsum, bounds the temporary memory.
+
+    Returns
+    -------
+    CrossSpectralMatrix
+    """
+    probe_array = np.asarray(probe_array, dtype=float)
+    if probe_array.ndim != 2:
+        raise ValueError(f"Expected an array of shape (n_times, n_probes), "
+                         f"got {probe_array.shape}.")
+    if noverlap is None:
+        noverlap = nperseg//2
+    n_times, n_probes = probe_array.shape
+    if n_times < nperseg:
+        raise ValueError(f"At least {nperseg} samples are needed.")
+    window = signal.get_window(window, nperseg)
+    segments = split_segments(probe_array, nperseg, nperseg - noverlap)
+    frequencies = np.fft.rfftfreq(nperseg, 1/fs)
+    band = slice(None)
+    if frequency_band is not None:
+        f_min, f_max = frequency_band
+        band = slice(np.searchsorted(frequencies, f_min, side="left"),
+                     np.searchsorted(frequencies, f_max, side="right"))
+    # (n_frequencies, n_segments, n_probes), the layout of the products.
+    spectra = segment_spectra(segments, window, detrend)[..., band]
+    spectra = np.ascontiguousarray(spectra.transpose(2, 0, 1))
+    scale = one_sided_scales(nperseg, spectral_scale(window, fs, scaling)
+                             / len(segments))[band]
+    pairs = None
+    if upper_triangle:
+        pairs = np.triu_indices(n_probes)
+        csd = np.empty((len(spectra), len(pairs[0])), dtype=complex)
+    else:
+        csd = np.empty((len(spectra), n_probes, n_probes), dtype=complex)
+    for start in range(0, len(spectra), frequency_block):
+        block = slice(start, start + frequency_block)
+        block_spectra = spectra[block]
+        block_csd = np.einsum("fsp,fsq->fpq", block_spectra.conj(),
+                              block_spectra, optimize=True)
+        block_csd *= scale[block, np.newaxis, np.newaxis]
+        if upper_triangle:
+            block_csd = block_csd[:, pairs[0], pairs[1]]
+        csd[block] = block_csd
+    return CrossSpectralMatrix(frequencies=frequencies[band], csd=csd,
+                               pairs=pairs)
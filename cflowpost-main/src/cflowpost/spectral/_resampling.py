@@ -0,0 +1,96 @@
+import numpy as np
+from fractions import Fraction
+from scipy import signal
+from scipy.interpolate import CubicSpline
+
+MAX_RESAMPLING_DENOMINATOR = 1000
+
+
+def effective_sampling_rate(times):
+    """Sampling rate of a non-uniformly sampled series, taken from its
+    median time step so that a few short steps, e.g. around write times,
+    do not bias it."""
+    return 1/np.median(np.diff(times))
+
+
+def resample_uniform(times, values, sampling_rate=None, method="linear",
+                     anti_alias=True):
+    """Put a non-uniformly sampled probe array on a uniform time grid.
+
+    Every probe and component is interpolated at once: the interval of each
+    new time instant is found with a single binary search shared by all the
+    series.
+
+    If `sampling_rate` is below the effective sampling rate of the record,
+    the series are first interpolated at the effective rate and then
+    decimated with a polyphase filter, whose FIR low-pass removes the
+    content above the new Nyquist frequency. Otherwise, or with
+    `anti_alias=False`, they are interpolated at `sampling_rate` directly.
+
+    Parameters
+    ----------
+    times : np.ndarray
+        Strictly increasing array of shape (n_times,), e.g. with restarts
+        already spliced by `foamparser.splice_probe_arrays`.
+    values : np.ndarray
+        Array of shape (n_times, ...), e.g. (n_times, n_probes,
+        n_components).
+    sampling_rate : float
+        Target sampling rate, defaults to the effective sampling rate.
+    method : str
+        "linear" or "cubic" (not-a-knot cubic spline) interpolation.
+    anti_alias : bool
+        Low-pass filter before decimating to a lower sampling rate.
+
+    Returns
+    -------
+    uniform_times : np.ndarray
+    uniform_values : np.ndarray
+        Array of shape (n_uniform_times, ...).
+    sampling_rate : float
+        Sampling rate of the result, to be passed to the PSD routines. It
+        may differ slightly from the requested one when decimating, since
+        the decimation ratio is rational.
+    """
+    times = np.asarray(times, dtype=float)
+    values = np.asarray(values)
+    if len(times) != len(values):
+        raise ValueError(f"Got {len(times)} time instants for "
+                         f"{len(values)} samples.")
+    if np.any(np.diff(times) <= 0):
+        raise ValueError("Time instants must be strictly increasing.")
+    if method not in ("linear", "cubic"):
+        raise ValueError(f"Unknown interpolation method '{method}'.")
+    native_rate = effective_sampling_rate(times)
+    if sampling_rate is None:
+        sampling_rate = native_rate
+    if not anti_alias or sampling_rate >= native_rate:
+        uniform_times = _uniform_grid(times, sampling_rate)
+        return (uniform_times, _interpolate(times, values, uniform_times,
+                                            method), sampling_rate)
+    ratio = Fraction(sampling_rate/native_rate).limit_denominator(
+        MAX_RESAMPLING_DENOMINATOR)
+    fine_times = _uniform_grid(times, native_rate)
+    fine_values = _interpolate(times, values, fine_times, method)
+    uniform_values = signal.resample_poly(fine_values, ratio.numerator,
+                                          ratio.denominator, axis=0)
+    sampling_rate = native_rate*ratio
+    uniform_times = times[0] + np.arange(len(uniform_values))/sampling_rate
+    return uniform_times, uniform_values, float(sampling_rate)
+
+
+def _uniform_grid(times, sampling_rate):
+    # Tolerance so that an end time on the grid is not lost to round-off.
+    n_times = int(np.floor((times[-1] - times[0])*sampling_rate + 1e-9)) + 1
+    return times[0] + np.arange(n_times)/sampling_rate
+
+
+def _interpolate(times, values, new_times, method):
+    if method == "cubic":
+        return CubicSpline(times, values, axis=0)(new_times)
+    intervals = np.clip(np.searchsorted(times, new_times, side="right") - 1,
+                        0, len(times) - 2)
+    weights = (new_times - times[intervals])/np.diff(times)[intervals]
+    weights = weights.reshape(-1, *(1,)*(values.ndim - 1))
+    return (values[intervals]*(1 - weights)
+            + values[intervals + 1]*weights)
@@ -0,0 +1,86 @@
+import numpy as np
+from scipy import signal
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class SegmentBuffer:
+    """Overlapping segments of a record fed in chunks.
+
+    Samples of segments overlapping a chunk boundary are carried over and
+    the segments completed with the next chunk, so the segments of all the
+    chunks are the ones of the whole record.
+
+    Instance attributes:
+
+    self.nperseg, self.noverlap -- segment length and overlap in samples
+    """
+
+    def __init__(self, nperseg, noverlap):
+        if not 0 <= noverlap < nperseg:
+            raise ValueError(f"noverlap must be less than the segment "
+                             f"length {nperseg}.")
+        self.nperseg = nperseg
+        self.noverlap = noverlap
+        self.reset()
+
+    @property
+    def step(self):
+        return self.nperseg - self.noverlap
+
+    def reset(self):
+        self._pending = None
+
+    def push(self, chunk) -> np.ndarray:
+        """Add the next samples, an array of shape (n_samples, ...), and
+        return the segments completed, of shape (n_segments, ..., nperseg).
+        """
+        chunk = np.asarray(chunk, dtype=float)
+        if self._pending is not None:
+            chunk = np.concatenate([self._pending, chunk])
+        segments = split_segments(chunk, self.nperseg, self.step)
+        # Copied so that the caller's chunk can be released or reused.
+        self._pending = chunk[len(segments)*self.step:].copy()
+        return segments
+
+
+def split_segments(values, nperseg, step) -> np.ndarray:
+    """(n_segments, ..., nperseg) view of the complete segments of `values`
+    along its first axis."""
+    if len(values) < nperseg:
+        return np.empty((0, *values.shape[1:], nperseg))
+    n_segments = (len(values) - nperseg)//step + 1
+    return sliding_window_view(values, nperseg,
+                               axis=0)[:n_segments*step:step]
+
+
+def segment_spectra(segments, window, detrend="constant") -> np.ndarray:
+    """Fourier transform of the detrended and windowed segments along their
+    last axis, `detrend` being "constant", "linear" or False."""
+    if detrend:
+        segments = signal.detrend(segments, type=detrend, axis=-1)
+    return np.fft.rfft(segments*window, axis=-1)
+
+
+def spectral_scale(window, sampling_rate, scaling) -> float:
+    """Scale of the squared transform of a windowed segment, "density" for
+    a PSD or "spectrum" for a power spectrum."""
+    if scaling == "density":
+        return 1/(sampling_rate*(window**2).sum())
+    if scaling == "spectrum":
+        return 1/window.sum()**2
+    raise ValueError(f"Unknown scaling '{scaling}'.")
+
+
+def one_sided_scales(nperseg, scale, bins=None) -> np.ndarray:
+    """Scale of every Fourier bin of a one-sided spectrum, or of `bins`.
+
+    The scale is doubled to account for the negative frequencies, except
+    for the DC and Nyquist bins, which have no negative counterpart.
+    """
+    if bins is None:
+        bins = np.arange(nperseg//2 + 1)
+    bins = np.asarray(bins)
+    doubled = bins > 0
+    if nperseg % 2 == 0:
+        doubled &= bins < nperseg//2
+    return np.where(doubled, 2*scale, scale)
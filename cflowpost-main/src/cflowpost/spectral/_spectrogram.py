@@ -0,0 +1,178 @@
+import numpy as np
+from dataclasses import dataclass
+from scipy import signal
+from ._segments import (SegmentBuffer,
+                        segment_spectra,
+                        spectral_scale,
+                        one_sided_scales)
+
+
+@dataclass
+class Spectrogram:
+    """Time-frequency map of one or several series.
+
+    Attributes:
+
+    times -- (n_times,) centre time of every (averaged) segment
+    frequencies -- (n_frequencies,) centre of every (averaged) bin
+    sxx -- (n_frequencies, n_times, ...) spectrogram, a memory map if an
+           output file was given
+    """
+    times: np.ndarray
+    frequencies: np.ndarray
+    sxx: np.ndarray
+
+
+class ChunkedSpectrogram:
+    """Spectrogram of a long record fed in chunks.
+
+    Segments overlapping a chunk boundary are carried over to the next
+    update and every completed output column is appended to
+    `output_file`, so memory is bounded by a chunk instead of the whole
+    (n_frequencies, n_segments) intermediate of `scipy.signal.spectrogram`.
+
+    The output can be decimated to stay plot-sized: `time_decimation`
+    consecutive segments and `frequency_decimation` adjacent bins are
+    averaged into one value. Without decimation the result equals
+    `scipy.signal.spectrogram` of the whole record, whose defaults are
+    also used here.
+
+    ```
+    spectrogram = ChunkedSpectrogram(fs, nperseg=4096, time_decimation=8,
+                                     output_file="U.spectrogram")
+    for times, values in iter_openfoam_probe(probe_file):
+        spectrogram.update(values)
+    result = spectrogram.finalize()
+    ```
+
+    Instance attributes:
+
+    self.sampling_rate -- sampling frequency of the record
+    self.nperseg, self.noverlap -- segment length and overlap in samples
+    self.window -- window applied to every segment
+    self.detrend -- "constant", "linear" or False
+    self.scaling -- "density" or "spectrum"
+    self.time_decimation, self.frequency_decimation -- averaging factors
+    self.output_file -- file the output is appended to, None keeps it in
+                        memory
+    self.start_time -- time of the first sample
+    self.series_shape -- trailing shape of the chunks, set by the first
+                         update
+    self.n_segments -- number of segments transformed so far
+    """
+
+    def __init__(self, sampling_rate, nperseg=256, noverlap=None,
+                 window=("tukey", 0.25), detrend="constant",
+                 scaling="density", time_decimation=1,
+                 frequency_decimation=1, output_file=None, start_time=0):
+        if noverlap is None:
+            noverlap = nperseg//8
+        self._buffer = SegmentBuffer(nperseg, noverlap)
+        if time_decimation < 1 or frequency_decimation < 1:
+            raise ValueError("Decimation factors must be at least 1.")
+        self.sampling_rate = sampling_rate
+        self.nperseg = nperseg
+        self.noverlap = noverlap
+        self.window = signal.get_window(window, nperseg)
+        self.detrend = detrend
+        # Applied per bin, before adjacent bins are averaged.
+        self._bin_scales = one_sided_scales(
+            nperseg, spectral_scale(self.window, sampling_rate, scaling))
+        self.scaling = scaling
+        self.time_decimation = time_decimation
+        self.frequency_decimation = frequency_decimation
+        self.output_file = output_file
+        self.start_time = start_time
+        frequencies = np.fft.rfftfreq(nperseg, 1/sampling_rate)
+        self._bin_starts = np.arange(0, len(frequencies),
+                                     frequency_decimation)
+        self._bin_counts = np.diff(np.append(self._bin_starts,
+                                             len(frequencies)))
+        self.frequencies = (np.add.reduceat(frequencies, self._bin_starts)
+                            / self._bin_counts)
+        self.n_segments = 0
+        self.series_shape = None
+        self._columns = []
+        self._n_columns = 0
+        self._group = []
+        if output_file is not None:
+            open(output_file, "wb").close()
+
+    @property
+    def step(self):
+        return self._buffer.step
+
+    def update(self, chunk):
+        """Add the next samples of the record, an array of shape
+        (n_samples, ...)."""
+        chunk = np.asarray(chunk, dtype=float)
+        if self.series_shape is None:
+            self.series_shape = chunk.shape[1:]
+        segments = self._buffer.push(chunk)
+        if len(segments):
+            spectra = segment_spectra(segments, self.window, self.detrend)
+            periodograms = (spectra.real**2 + spectra.imag**2)*self._bin_scales
+            # (n_segments, n_frequencies, ...) with averaged bins.
+            periodograms = (np.add.reduceat(periodograms, self._bin_starts,
+                                            axis=-1)/self._bin_counts)
+            self._group.extend(np.moveaxis(periodograms, -1, 1))
+            self.n_segments += len(segments)
+            self._write_groups()
+        return self
+
+    def finalize(self) -> Spectrogram:
+        """Write the last, possibly incomplete, group of segments and return
+        the spectrogram."""
+        if self.series_shape is None:
+            raise ValueError("No samples were fed.")
+        self._write_groups(final=True)
+        shape = (self._n_columns, len(self.frequencies),
+                 *self.series_shape)
+        if self.output_file is not None and self._n_columns:
+            columns = np.memmap(self.output_file, dtype=float, mode="r",
+                                shape=shape)
+        elif self._columns:
+            columns = np.stack(self._columns)
+        else:
+            columns = np.empty(shape)
+        # Centre of every segment, averaged within every group.
+        segment_times = (self.start_time + (self.nperseg/2 + self.step
+                                            * np.arange(self.n_segments))
+                         / self.sampling_rate)
+        group_starts = np.arange(0, self.n_segments, self.time_decimation)
+        times = (np.add.reduceat(segment_times, group_starts)
+                 / np.diff(np.append(group_starts, self.n_segments))
+                 if self.n_segments else segment_times)
+        return Spectrogram(times=times, frequencies=self.frequencies,
+                           sxx=np.moveaxis(columns, 0, 1))
+
+    def _write_groups(self, final=False):
+        n_complete = len(self._group)//self.time_decimation
+        groups = [self._group[i*self.time_decimation:
+                              (i + 1)*self.time_decimation]
+                  for i in range(n_complete)]
+        remainder = self._group[n_complete*self.time_decimation:]
+        if final and remainder:
+            groups.append(remainder)
+            remainder = []
+        self._group = remainder
+        if not groups:
+            return
+        columns = np.stack([np.mean(group, axis=0) for group in groups])
+        if self.output_file is None:
+            self._columns.extend(columns)
+        else:
+            with open(self.output_file, "ab") as f:
+                f.write(columns.tobytes())
+        self._n_columns += len(columns)
+
+
+def compute_chunked_spectrogram(chunks, sampling_rate, output_file=None,
+                                **kwargs) -> Spectrogram:
+    """Spectrogram of a record given as an iterable of (n_samples, ...)
+    chunks, see `ChunkedSpectrogram` for the keyword arguments."""
+    spectrogram = ChunkedSpectrogram(sampling_rate, output_file=output_file,
+                                     **kwargs)
+    for chunk in chunks:
+        spectrogram.update(chunk)
+    return spectrogram.finalize()
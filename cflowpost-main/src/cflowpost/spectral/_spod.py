@@ -0,0 +1,253 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+from scipy import signal
+from ._segments import SegmentBuffer, spectral_scale, one_sided_scales
+
+DEFAULT_SNAPSHOT_CHUNK = 64
+DEFAULT_N_MODES = 5
+
+
+@dataclass
+class SPODResult:
+    """Leading SPOD modes of the requested frequencies.
+
+    Attributes:
+
+    frequencies -- (n_frequencies,) array of frequencies
+    eigenvalues -- (n_frequencies, n_modes) modal energies, descending
+    modes -- (n_frequencies, n_modes, *snapshot_shape) complex modes,
+             orthonormal in the weighted inner product, a memory map
+    n_blocks -- number of blocks the estimate is based on
+    """
+    frequencies: np.ndarray
+    eigenvalues: np.ndarray
+    modes: np.ndarray
+    n_blocks: int
+
+
+class SPOD:
+    """Spectral proper orthogonal decomposition of streamed snapshots.
+
+    Snapshots are fed in chunks of shape (n_times, *snapshot_shape), e.g.
+    (n_times, n_points, n_components) plane data. Every time a block of
+    `nfft` snapshots is complete it is windowed and Fourier transformed and
+    only the coefficients of the requested frequencies are appended to a
+    memory mapped file, so memory is bounded by one block and the
+    coefficients of one frequency at a time.
+
+    The mean is not needed in advance. The transform is linear, so the
+    coefficients of the mean of all fed snapshots are subtracted when the
+    coefficients are read back.
+
+    `compute` solves the eigenproblem of every frequency with the method of
+    snapshots, i.e. of the (n_blocks, n_blocks) cross spectral matrix of
+    the blocks, instead of the one of size n_points. The modes of every
+    frequency are written to a memory mapped file as they are computed.
+
+    ```
+    with SPOD(nfft=256, sampling_rate=fs, frequencies=[50, 100]) as spod:
+        for chunk in read_csv_snapshots(plane_files, ["U_0", "U_1"]):
+            spod.update(chunk)
+        result = spod.compute(n_modes=5)
+    ```
+
+    Instance attributes:
+
+    self.nfft, self.noverlap -- block length and overlap in snapshots
+    self.sampling_rate -- sampling frequency of the snapshots
+    self.window -- window applied to every block
+    self.frequencies -- frequencies whose coefficients are kept
+    self.weights -- quadrature weights of the snapshot entries, e.g. cell
+                    areas, of shape snapshot_shape or None for uniform ones
+    self.coefficients_file -- path of the memory mapped coefficients
+    self.modes_file -- path of the memory mapped modes of the last
+                       `compute`, removed by `close` if temporary
+    self.snapshot_shape -- shape of a single snapshot, set by the first update
+    self.n_blocks -- number of blocks transformed so far
+    self.n_snapshots -- number of snapshots fed so far
+    """
+
+    def __init__(self, nfft, sampling_rate=1, noverlap=None, window="hann",
+                 frequencies: Sequence[float] = None, weights=None,
+                 coefficients_file=None, dtype=np.complex64):
+        if noverlap is None:
+            noverlap = nfft//2
+        self._buffer = SegmentBuffer(nfft, noverlap)
+        self.nfft = nfft
+        self.noverlap = noverlap
+        self.sampling_rate = sampling_rate
+        self.window = signal.get_window(window, nfft)
+        all_frequencies = np.fft.rfftfreq(nfft, 1/sampling_rate)
+        if frequencies is None:
+            self._bins = np.arange(len(all_frequencies))
+        else:
+            # Nearest frequency bin of every requested frequency.
+            self._bins = np.unique(np.abs(
+                all_frequencies[:, np.newaxis]
+                - np.asarray(frequencies, dtype=float)).argmin(axis=0))
+        self.frequencies = all_frequencies[self._bins]
+        self._scales = one_sided_scales(
+            nfft, spectral_scale(self.window, sampling_rate, "density"),
+            self._bins)
+        self.weights = None if weights is None else np.asarray(weights)
+        self.dtype = np.dtype(dtype)
+        self._owns_file = coefficients_file is None
+        self.modes_file = None
+        self._owns_modes_file = False
+        if coefficients_file is None:
+            file_descriptor, coefficients_file = tempfile.mkstemp(
+                prefix="spod", suffix=".bin")
+            os.close(file_descriptor)
+        self.coefficients_file = coefficients_file
+        open(self.coefficients_file, "wb").close()
+        self._window_transform = self._transform(
+            self.window[:, np.newaxis])[:, 0]
+        self.n_blocks = 0
+        self.n_snapshots = 0
+        self.snapshot_shape = None
+        self._snapshot_sum = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Remove the coefficients and modes files if they are temporary
+        ones."""
+        if self._owns_file and os.path.isfile(self.coefficients_file):
+            os.remove(self.coefficients_file)
+        if self._owns_modes_file and os.path.isfile(self.modes_file):
+            os.remove(self.modes_file)
+
+    @property
+    def step(self):
+        return self._buffer.step
+
+    def update(self, chunk):
+        """Add the next snapshots, an array of shape
+        (n_times, *snapshot_shape)."""
+        chunk = np.asarray(chunk, dtype=float)
+        if self.snapshot_shape is None:
+            self.snapshot_shape = chunk.shape[1:]
+            self._snapshot_sum = np.zeros(int(np.prod(self.snapshot_shape)))
+        chunk = chunk.reshape(len(chunk), -1)
+        self._snapshot_sum += chunk.sum(axis=0)
+        self.n_snapshots += len(chunk)
+        # (n_blocks, n_entries, nfft)
+        blocks = self._buffer.push(chunk)
+        with open(self.coefficients_file, "ab") as f:
+            for block in blocks:
+                f.write(self._transform((block*self.window).T)
+                        .astype(self.dtype).tobytes())
+        self.n_blocks += len(blocks)
+        return self
+
+    def coefficients(self, frequency_index) -> np.ndarray:
+        """(n_blocks, n_entries) Fourier coefficients of the mean
+        subtracted blocks at `self.frequencies[frequency_index]`."""
+        stored = np.memmap(self.coefficients_file, dtype=self.dtype,
+                           mode="r", shape=(self.n_blocks,
+                                            len(self._bins),
+                                            len(self._snapshot_sum)))
+        mean = self._snapshot_sum/self.n_snapshots
+        return (np.asarray(stored[:, frequency_index], dtype=complex)
+                - self._window_transform[frequency_index]*mean)
+
+    def compute(self, n_modes=DEFAULT_N_MODES,
+                modes_file=None) -> SPODResult:
+        """Solve the eigenproblem of every frequency.
+
+        Parameters
+        ----------
+        n_modes : int
+            Leading modes kept per frequency, at most n_blocks. None keeps
+            all of them.
+        modes_file : str
+            File the modes are memory mapped to, defaults to a temporary
+            file removed by `close`.
+
+        Returns
+        -------
+        SPODResult
+        """
+        if self.n_blocks < 2:
+            raise ValueError(f"At least two blocks are needed, got "
+                             f"{self.n_blocks}.")
+        if n_modes is None:
+            n_modes = self.n_blocks
+        n_modes = min(n_modes, self.n_blocks)
+        n_entries = len(self._snapshot_sum)
+        weights = np.ones(n_entries)
+        if self.weights is not None:
+            weights = np.broadcast_to(self.weights,
+                                      self.snapshot_shape).reshape(-1)
+        modes_file = self._modes_file(modes_file)
+        eigenvalues = np.empty((len(self._bins), n_modes))
+        modes = np.memmap(modes_file, dtype=self.dtype, mode="w+",
+                          shape=(len(self._bins), n_modes, n_entries))
+        for i in range(len(self._bins)):
+            # (n_entries, n_blocks), every column a realization.
+            q_hat = self.coefficients(i).T
+            cross_spectral = (q_hat.conj().T @ (weights[:, np.newaxis]
+                                                * q_hat))/self.n_blocks
+            block_eigenvalues, theta = np.linalg.eigh(cross_spectral)
+            order = np.argsort(block_eigenvalues)[::-1][:n_modes]
+            block_eigenvalues = np.clip(block_eigenvalues[order], 0, None)
+            eigenvalues[i] = block_eigenvalues
+            with np.errstate(divide="ignore", invalid="ignore"):
+                normalization = np.where(
+                    block_eigenvalues > 0,
+                    1/np.sqrt(self.n_blocks*block_eigenvalues), 0)
+            modes[i] = ((q_hat @ theta[:, order])*normalization).T
+        modes.flush()
+        return SPODResult(frequencies=self.frequencies,
+                          eigenvalues=eigenvalues,
+                          modes=modes.reshape(len(self._bins), n_modes,
+                                              *self.snapshot_shape),
+                          n_blocks=self.n_blocks)
+
+    def _modes_file(self, modes_file):
+        if self._owns_modes_file and os.path.isfile(self.modes_file):
+            os.remove(self.modes_file)
+        self._owns_modes_file = modes_file is None
+        if modes_file is None:
+            file_descriptor, modes_file = tempfile.mkstemp(
+                prefix="spod", suffix=".modes")
+            os.close(file_descriptor)
+        self.modes_file = modes_file
+        return modes_file
+
+    def _transform(self, windowed_block):
+        """Scaled one-sided Fourier coefficients of the kept frequency bins,
+        such that the eigenvalues add up to the Welch PSD summed over the
+        snapshot entries."""
+        if len(self._bins) <= np.log2(self.nfft):
+            # A few bins, a direct DFT is cheaper than the full FFT.
+            exponents = np.outer(self._bins, np.arange(self.nfft))
+            dft = np.exp(-2j*np.pi*exponents/self.nfft)
+            coefficients = dft @ windowed_block
+        else:
+            coefficients = np.fft.rfft(windowed_block, axis=0)[self._bins]
+        return coefficients*np.sqrt(self._scales)[:, np.newaxis]
+
+
+def read_csv_snapshots(csv_files: Iterable[str], columns: Sequence[str],
+                       chunk_size=DEFAULT_SNAPSHOT_CHUNK):
+    """Yield snapshots stored one per csv file, e.g. the planes written by
+    `pvx.extract` for consecutive timesteps, in chunks of shape
+    (chunk_size, n_points, len(columns))."""
+    chunk = []
+    for csv_file in csv_files:
+        chunk.append(pd.read_csv(csv_file, usecols=list(columns))[
+            list(columns)].to_numpy())
+        if len(chunk) == chunk_size:
+            yield np.stack(chunk)
+            chunk = []
+    if chunk:
+        yield np.stack(chunk)
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Tuple, Union
+from scipy import signal
+from ..foamparser import ProbeDataset
+
+DEFAULT_CHUNK_SERIES = 256
+
+
+@dataclass
+class WelchPSD:
+    """Power spectral densities of several probes and components.
+
+    Attributes:
+
+    frequencies -- (n_frequencies,) array of sample frequencies
+    psd -- (n_frequencies, n_probes, n_components) array
+    probe_ids -- (n_probes,) probe labels
+    components -- labels of the components, e.g. ("x", "y", "z")
+    """
+    frequencies: np.ndarray
+    psd: np.ndarray
+    probe_ids: np.ndarray
+    components: Tuple[str, ...]
+
+    def probe(self, probe: int) -> np.ndarray:
+        """(n_frequencies, n_components) view of a single probe."""
+        return self.psd[:, probe]
+
+    def component(self, component: Union[int, str]) -> np.ndarray:
+        """(n_frequencies, n_probes) view of a single component."""
+        if isinstance(component, str):
+            component = self.components.index(component)
+        return self.psd[..., component]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Dataframe indexed by frequency with (probe, component) column
+        levels."""
+        column_index = pd.MultiIndex.from_product(
+            [self.probe_ids, list(self.components)],
+            names=["Probe", "Component"])
+        return pd.DataFrame(self.psd.reshape(len(self.frequencies), -1),
+                            index=pd.Index(self.frequencies,
+                                           name="Frequency"),
+                            columns=column_index)
+
+
+def compute_batched_welch_psd(values: Union[np.ndarray, ProbeDataset],
+                              sampling_rate, max_workers=1,
+                              chunk_series=DEFAULT_CHUNK_SERIES,
+                              probe_ids=None, components=None,
+                              **kwargs) -> WelchPSD:
+    """Welch PSD of every probe and component of a probe array at once.
+
+    All the series of a chunk are handled by a single `scipy.signal.welch`
+    call along the time axis instead of one call per series. Chunks bound
+    the memory of the intermediate segment arrays and are distributed over
+    a thread pool, numpy and scipy's FFT release the GIL.
+
+    Parameters
+    ----------
+    values : np.ndarray or ProbeDataset
+        Array of shape (n_times, n_probes, n_components), a
+        (n_times, n_probes) array is treated as a single component. Labels
+        are taken from a `ProbeDataset`.
+    sampling_rate : float
+        Sampling frequency of the time series.
+    max_workers : int
+        Threads computing the chunks. None uses one per CPU.
+    chunk_series : int
+        Maximum number of (probe, component) series per welch call.
+    probe_ids : Sequence
+        Labels of the probes, defaults to their position.
+    components : Sequence[str]
+        Labels of the components, defaults to their position.
+    kwargs :
+        Passed to `scipy.signal.welch`, e.g. nperseg or window.
+
+    Returns
+    -------
+    WelchPSD
+    """
+    if isinstance(values, ProbeDataset):
+        probe_ids = values.probe_ids if probe_ids is None else probe_ids
+        components = (values.components if components is None
+                      else components)
+        values = values.values
+    values = np.asarray(values)
+    if values.ndim == 2:
+        values = values[..., np.newaxis]
+    n_times, n_probes, n_components = values.shape
+    if probe_ids is None:
+        probe_ids = np.arange(n_probes)
+    if components is None:
+        components = tuple(str(i) for i in range(n_components))
+    # Series along the last axis, the layout welch segments fastest.
+    series = values.reshape(n_times, -1).T
+    chunks = [slice(start, start + chunk_series)
+              for start in range(0, series.shape[0], chunk_series)]
+    frequencies, first_psd = signal.welch(series[chunks[0]], sampling_rate,
+                                          axis=-1, **kwargs)
+    psd = np.empty((series.shape[0], len(frequencies)))
+    psd[chunks[0]] = first_psd
+
+    def compute_chunk(chunk):
+        psd[chunk] = signal.welch(series[chunk], sampling_rate, axis=-1,
+                                  **kwargs)[1]
+
+    if len(chunks) > 1 and max_workers != 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(compute_chunk, chunks[1:]))
+    else:
+        for chunk in chunks[1:]:
+            compute_chunk(chunk)
+    psd = np.ascontiguousarray(psd.T).reshape(len(frequencies), n_probes,
+                                              n_components)
+    return WelchPSD(frequencies=frequencies, psd=psd,
+                    probe_ids=np.asarray(probe_ids),
+                    components=tuple(components))
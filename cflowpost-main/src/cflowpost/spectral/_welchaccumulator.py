@@ -0,0 +1,93 @@
+import numpy as np
+from scipy import signal
+from ._segments import (SegmentBuffer,
+                        segment_spectra,
+                        spectral_scale,
+                        one_sided_scales)
+
+
+class WelchAccumulator:
+    """Welch PSD estimate of a signal fed in chunks.
+
+    Only the running sum of the windowed periodograms and the samples of
+    the segment still to be completed are kept, i.e. O(nperseg) memory
+    regardless of the record length. Segments overlapping a chunk boundary
+    are carried over to the next update, so after feeding a whole record
+    the estimate equals `scipy.signal.welch` of it.
+
+    Chunks are arrays of shape (n_samples, ...), e.g. the values yielded by
+    `foamparser.iter_openfoam_probe`:
+
+    ```
+    accumulator = WelchAccumulator(sampling_rate, nperseg=1024)
+    for times, values in iter_openfoam_probe(probe_file):
+        accumulator.update(values)
+    f, pxx = accumulator.result()
+    ```
+
+    Instance attributes:
+
+    self.sampling_rate -- sampling frequency of the signal
+    self.nperseg, self.noverlap -- segment length and overlap in samples
+    self.window -- window applied to every segment
+    self.detrend -- "constant", "linear" or False
+    self.scaling -- "density" or "spectrum"
+    self.n_segments -- number of segments averaged so far
+    """
+
+    def __init__(self, sampling_rate, nperseg=256, noverlap=None,
+                 window="hann", detrend="constant", scaling="density"):
+        if noverlap is None:
+            noverlap = nperseg//2
+        self._buffer = SegmentBuffer(nperseg, noverlap)
+        self.sampling_rate = sampling_rate
+        self.nperseg = nperseg
+        self.noverlap = noverlap
+        self.window = signal.get_window(window, nperseg)
+        self.detrend = detrend
+        self._scales = one_sided_scales(
+            nperseg, spectral_scale(self.window, sampling_rate, scaling))
+        self.scaling = scaling
+        self.reset()
+
+    @property
+    def step(self):
+        return self._buffer.step
+
+    def reset(self):
+        self.n_segments = 0
+        self._periodogram_sum = None
+        self._buffer.reset()
+
+    def update(self, chunk):
+        """Add the next samples of the signal, an array of shape
+        (n_samples, ...) whose trailing shape is the same for every chunk.
+        """
+        segments = self._buffer.push(chunk)
+        if len(segments):
+            spectra = segment_spectra(segments, self.window, self.detrend)
+            periodogram_sum = (spectra.real**2 + spectra.imag**2).sum(axis=0)
+            if self._periodogram_sum is None:
+                self._periodogram_sum = periodogram_sum
+            else:
+                self._periodogram_sum += periodogram_sum
+            self.n_segments += len(segments)
+        return self
+
+    def result(self):
+        """Current PSD estimate.
+
+        Returns
+        -------
+        f : np.ndarray
+            Array of sample frequencies.
+        pxx : np.ndarray
+            Array of shape (n_frequencies, ...), as returned by
+            `scipy.signal.welch` along axis 0.
+        """
+        if not self.n_segments:
+            raise ValueError(f"At least {self.nperseg} samples are needed "
+                             f"for an estimate.")
+        frequencies = np.fft.rfftfreq(self.nperseg, 1/self.sampling_rate)
+        pxx = self._periodogram_sum*(self._scales/self.n_segments)
+        return frequencies, np.moveaxis(pxx, -1, 0)
@@ -1 +1,14 @@
-from ._xcorr import SignalStackXCorrelationFunction
+from ._xcorr import (SignalStackXCorrelationFunction,
+                     DEFAULT_CHUNK_LINES,
+                     lagged_product_sums)
+from ._chunked import (ChunkedSignalStackXCorrelationFunction,
+                       XCorrelationAccumulator,
+                       iter_line_blocks)
+from ._spacetime import SpaceTimeCorrelation, space_time_correlation
+from ._bootstrap import CorrelationBands, correlation_confidence_bands
+from ._integralscales import (IntegralScales,
+                              DEFAULT_CORRELATION_THRESHOLD,
+                              integral_scales,
+                              autocorrelation,
+                              integral_time_scales,
+                              integral_length_scales_table)
@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Sequence
+from scipy import sparse, stats
+from ._xcorr import DEFAULT_CHUNK_LINES, lagged_product_sums
+
+DEFAULT_N_REPLICAS = 1000
+DEFAULT_CHUNK_REPLICAS = 64
+
+
+@dataclass
+class CorrelationBands:
+    """Two point correlation of a signal stack with confidence bands.
+
+    Attributes:
+
+    separations -- (n_points,) separations, one per lag
+    correlation -- (n_points, n_components) estimate of the whole stack
+    lower, upper -- (n_points, n_components) bounds of the band
+    standard_error -- (n_points, n_components) spread of the replicas
+    confidence -- confidence level of the band, e.g. 0.95
+    method -- "bootstrap" or "jackknife"
+    n_replicas -- number of resampled stacks the band is based on
+    """
+    separations: np.ndarray
+    correlation: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+    standard_error: np.ndarray
+    confidence: float
+    method: str
+    n_replicas: int
+
+    def to_dataframe(self, tpc_keys: Sequence[str] = None) -> pd.DataFrame:
+        """Dataframe indexed by separation ("x_ast") with a column per
+        component and "_lower", "_upper" columns of its band."""
+        if tpc_keys is None:
+            tpc_keys = ["B_uu", "B_vv", "B_ww"][:self.correlation.shape[1]]
+        data = {}
+        for i, key in enumerate(tpc_keys):
+            data[key] = self.correlation[:, i]
+            data[f"{key}_lower"] = self.lower[:, i]
+            data[f"{key}_upper"] = self.upper[:, i]
+        return pd.DataFrame(data, index=pd.Index(self.separations,
+                                                 name="x_ast"))
+
+
+def correlation_confidence_bands(signal_stack, index_length=1,
+                                 zero_padded=True, method="bootstrap",
+                                 n_replicas=DEFAULT_N_REPLICAS,
+                                 confidence=0.95, random_state=None,
+                                 max_workers=None,
+                                 chunk_replicas=DEFAULT_CHUNK_REPLICAS,
+                                 chunk_lines=DEFAULT_CHUNK_LINES
+                                 ) -> CorrelationBands:
+    """Confidence bands of `SignalStackXCorrelationFunction` by resampling
+    the lines of the stack.
+
+    The lagged product sums, counts and sums of squares of every line are
+    computed once with FFTs. A resampled stack is then only a weighted sum
+    of these contributions, so the sums of all bootstrap replicas are
+    obtained with one product of a sparse (n_replicas, n_lines) matrix of
+    resampling counts, computed `chunk_replicas` rows at a time on a
+    thread pool, instead of recomputing the correlation of every replica.
+
+    The bootstrap band is the percentile interval of the replicas. The
+    jackknife leaves one line out at a time, i.e. subtracts the
+    contributions of a line from the totals, and gives a normal band of
+    its standard error.
+
+    Parameters
+    ----------
+    signal_stack : np.ndarray
+        Array of shape (n_lines, n_points, n_components).
+    index_length : float
+        Separation between consecutive points.
+    zero_padded : bool
+        Padding mode, see `SignalStackXCorrelationFunction`.
+    method : str
+        "bootstrap" or "jackknife".
+    n_replicas : int
+        Bootstrap replicas, ignored by the jackknife.
+    confidence : float
+        Confidence level of the band.
+    random_state : int
+        Seed of the bootstrap resampling.
+    max_workers : int
+        Threads computing the replicas. None uses one per CPU.
+    chunk_replicas : int
+        Replicas computed per matrix product, bounds the temporary memory.
+    chunk_lines : int
+        Lines transformed at once.
+
+    Returns
+    -------
+    CorrelationBands
+    """
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1.")
+    product_sums, counts = lagged_product_sums(signal_stack, zero_padded,
+                                               chunk_lines, per_line=True)
+    n_lines, n_points, n_components = product_sums.shape
+    square_sums = np.concatenate([
+        (np.asarray(signal_stack[start:start + chunk_lines],
+                    dtype=float)**2).sum(axis=1)
+        for start in range(0, n_lines, chunk_lines)])
+    # One row per line, every line contributes n_points entries to the
+    # mean square.
+    contributions = np.hstack([product_sums.reshape(n_lines, -1),
+                               counts.reshape(n_lines, -1), square_sums,
+                               np.full((n_lines, 1), n_points)])
+    totals = contributions.sum(axis=0)
+    correlation = _correlation(totals[np.newaxis], n_points,
+                               n_components)[0]
+    if method == "bootstrap":
+        rng = np.random.default_rng(random_state)
+        lines = rng.integers(0, n_lines, size=(n_replicas, n_lines))
+        # Duplicated (replica, line) entries are summed into counts.
+        resampling = sparse.csr_matrix(
+            (np.ones(lines.size), (np.repeat(np.arange(n_replicas),
+                                             n_lines), lines.ravel())),
+            shape=(n_replicas, n_lines))
+        replicas = np.empty((n_replicas, n_points, n_components))
+
+        def compute_chunk(chunk):
+            replicas[chunk] = _correlation(
+                resampling[chunk] @ contributions, n_points, n_components)
+
+        chunks = [slice(start, start + chunk_replicas)
+                  for start in range(0, n_replicas, chunk_replicas)]
+        if len(chunks) > 1 and max_workers != 1:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(compute_chunk, chunks))
+        else:
+            for chunk in chunks:
+                compute_chunk(chunk)
+        alpha = 100*(1 - confidence)/2
+        lower, upper = np.percentile(replicas, [alpha, 100 - alpha],
+                                     axis=0)
+        standard_error = replicas.std(axis=0, ddof=1)
+    elif method == "jackknife":
+        if n_lines < 2:
+            raise ValueError("The jackknife needs at least two lines.")
+        n_replicas = n_lines
+        replicas = _correlation(totals - contributions, n_points,
+                                n_components)
+        standard_error = np.sqrt((n_lines - 1)/n_lines*(
+            (replicas - replicas.mean(axis=0))**2).sum(axis=0))
+        z = stats.norm.ppf(0.5 + confidence/2)
+        lower = correlation - z*standard_error
+        upper = correlation + z*standard_error
+    else:
+        raise ValueError(f"Unknown method '{method}'.")
+    return CorrelationBands(separations=np.arange(n_points)*index_length,
+                            correlation=correlation, lower=lower,
+                            upper=upper, standard_error=standard_error,
+                            confidence=confidence, method=method,
+                            n_replicas=n_replicas)
+
+
+def _correlation(sums, n_points, n_components):
+    """(n_replicas, n_points, n_components) correlations from rows of
+    summed contributions, laid out as in `correlation_confidence_bands`."""
+    sums = np.asarray(sums)
+    size = n_points*n_components
+    product_sums = sums[:, :size].reshape(-1, n_points, n_components)
+    counts = sums[:, size:2*size].reshape(-1, n_points, n_components)
+    variance = sums[:, 2*size:2*size + n_components]/sums[:, -1:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return product_sums/counts/variance[:, np.newaxis]
@@ -0,0 +1,162 @@
+import numpy as np
+from typing import Iterable, Union
+from ._xcorr import (XCorrelationFunction,
+                     DEFAULT_CHUNK_LINES,
+                     lagged_product_sums,
+                     lagged_xcorr_function)
+
+LineBlocks = Union[np.ndarray, Iterable[np.ndarray]]
+
+
+class ChunkedSignalStackXCorrelationFunction(XCorrelationFunction):
+    """Two point correlation of a signal stack too large for memory.
+
+    Same correlation as `SignalStackXCorrelationFunction`, but the lines
+    are consumed block by block: either from an iterable of
+    (n_lines, n_points, n_components) blocks, e.g. one per timestep, or
+    from a (memory mapped) stack read `chunk_lines` lines at a time. Only
+    the lag-wise sums of products, their counts and the sums of squares are
+    kept, so peak memory is bounded by one block.
+    """
+
+    def __init__(self, line_blocks: LineBlocks, index_length=1,
+                 zero_padded=True, chunk_lines=DEFAULT_CHUNK_LINES):
+        self.__xcorr_func = self._compute_xcorr_function(
+            line_blocks, index_length, zero_padded, chunk_lines)
+
+    def __call__(self, x_asterisk):
+        x_asterisk = np.asarray(x_asterisk)
+        if x_asterisk.shape:
+            return np.stack([self.__xcorr_func(x_ast) for x_ast in x_asterisk])
+        return self.__xcorr_func(x_asterisk)
+
+    @staticmethod
+    def _compute_xcorr_function(line_blocks: LineBlocks,
+                                index_length=1,
+                                zero_padded=True,
+                                chunk_lines=DEFAULT_CHUNK_LINES):
+        accumulator = XCorrelationAccumulator(index_length=index_length,
+                                              zero_padded=zero_padded,
+                                              chunk_lines=chunk_lines)
+        for block in iter_line_blocks(line_blocks, chunk_lines):
+            accumulator.update(block)
+        return accumulator.xcorr_function()
+
+
+class XCorrelationAccumulator:
+    """Running two point correlation of line samples arriving over time.
+
+    Only the lag-wise sums of products, their counts and the sums of
+    squares are kept, so adding N lines costs the FFTs of those N lines
+    whatever was added before, and accumulators filled by different
+    workers can be merged exactly. The correlation at any point equals
+    `SignalStackXCorrelationFunction` of all the lines added so far.
+
+    ```
+    accumulator = XCorrelationAccumulator(index_length=arc_length/n_points)
+    for line_block in new_samples():
+        accumulator.update(line_block)
+        print(accumulator.result()[:, 0])
+    ```
+
+    Instance attributes:
+
+    self.index_length -- separation between consecutive points
+    self.zero_padded -- padding mode, see `SignalStackXCorrelationFunction`
+    self.chunk_lines -- lines transformed at once
+    self.product_sums -- (n_points, n_components) lagged product sums
+    self.counts -- (n_points, n_components) number of products summed
+    self.square_sums -- (n_components,) sums of squares
+    self.n_entries -- number of (line, point) entries added
+    self.n_lines -- number of lines added
+    """
+
+    def __init__(self, index_length=1, zero_padded=True,
+                 chunk_lines=DEFAULT_CHUNK_LINES):
+        self.index_length = index_length
+        self.zero_padded = zero_padded
+        self.chunk_lines = chunk_lines
+        self.product_sums = None
+        self.counts = None
+        self.square_sums = None
+        self.n_entries = 0
+        self.n_lines = 0
+
+    def update(self, line_block):
+        """Add a block of lines of shape (n_lines, n_points, n_components),
+        a single line of shape (n_points, n_components) is also accepted.
+        """
+        line_block = np.asarray(line_block, dtype=float)
+        if line_block.ndim == 2:
+            line_block = line_block[np.newaxis]
+        product_sums, counts = lagged_product_sums(
+            line_block, self.zero_padded, self.chunk_lines)
+        # NaNs propagate, as in the mean of the direct method.
+        square_sums = (line_block**2).sum(axis=(0, 1))
+        self._add(product_sums, counts, square_sums,
+                  line_block.shape[0]*line_block.shape[1],
+                  line_block.shape[0])
+        return self
+
+    def merge(self, other: "XCorrelationAccumulator"):
+        """Add the sums of another accumulator, e.g. one filled by another
+        worker with different lines."""
+        if (other.index_length != self.index_length
+                or other.zero_padded != self.zero_padded):
+            raise ValueError("Cannot merge accumulators with different "
+                             "index lengths or padding.")
+        if other.n_lines:
+            self._add(other.product_sums, other.counts, other.square_sums,
+                      other.n_entries, other.n_lines)
+        return self
+
+    def result(self, x_asterisk=None):
+        """Current correlation at the separations `x_asterisk`, or of every
+        lag, i.e. an (n_points, n_components) array, if not given."""
+        xcorr_func = self.xcorr_function()
+        if x_asterisk is None:
+            # Indexed by lag directly, int(k*index_length/index_length)
+            # may round down to k - 1.
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return (self.product_sums/self.counts
+                        / (self.square_sums/self.n_entries))
+        x_asterisk = np.asarray(x_asterisk)
+        if x_asterisk.shape:
+            return np.stack([xcorr_func(x_ast) for x_ast in x_asterisk])
+        return xcorr_func(x_asterisk)
+
+    def xcorr_function(self):
+        """Current correlation as a function of the separation."""
+        if not self.n_lines:
+            raise ValueError("No lines have been added.")
+        return lagged_xcorr_function(self.product_sums, self.counts,
+                                     self.square_sums/self.n_entries,
+                                     self.index_length, self.zero_padded)
+
+    def _add(self, product_sums, counts, square_sums, n_entries, n_lines):
+        if self.product_sums is None:
+            self.product_sums = np.array(product_sums)
+            self.counts = np.array(counts)
+            self.square_sums = np.array(square_sums)
+        else:
+            if product_sums.shape != self.product_sums.shape:
+                raise ValueError(f"Lines of shape {product_sums.shape} do "
+                                 f"not match {self.product_sums.shape}.")
+            self.product_sums += product_sums
+            self.counts += counts
+            self.square_sums += square_sums
+        self.n_entries += n_entries
+        self.n_lines += n_lines
+
+
+def iter_line_blocks(line_blocks: LineBlocks,
+                     chunk_lines=DEFAULT_CHUNK_LINES):
+    """Yield (n_lines, n_points, n_components) float blocks from a stack,
+    `chunk_lines` lines at a time, or from an iterable of blocks."""
+    if isinstance(line_blocks, np.ndarray):
+        for start in range(0, len(line_blocks), chunk_lines):
+            yield np.asarray(line_blocks[start:start + chunk_lines],
+                             dtype=float)
+        return
+    for block in line_blocks:
+        yield np.asarray(block, dtype=float)
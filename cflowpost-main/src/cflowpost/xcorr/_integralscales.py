@@ -0,0 +1,213 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass
+from typing import Mapping
+from scipy.integrate import cumulative_trapezoid
+from ._xcorr import DEFAULT_CHUNK_LINES, lagged_product_sums
+
+DEFAULT_CORRELATION_THRESHOLD = 0.
+
+
+@dataclass
+class IntegralScales:
+    """Integral scales of many correlation curves.
+
+    Attributes:
+
+    scales -- integral of every curve up to its first crossing of the
+              threshold, or over the whole range if it never crosses it
+    crossings -- separation or time lag of the first crossing, NaN if the
+                 curve never crosses the threshold
+    threshold -- correlation level the curves are integrated down to
+    """
+    scales: np.ndarray
+    crossings: np.ndarray
+    threshold: float
+
+    @property
+    def converged(self) -> np.ndarray:
+        """Whether every curve crosses the threshold within its range,
+        otherwise its scale is only a lower bound."""
+        return ~np.isnan(self.crossings)
+
+
+def integral_scales(correlation, lags, threshold=DEFAULT_CORRELATION_THRESHOLD,
+                    axis=0) -> IntegralScales:
+    """Integral scales of a batch of correlation curves at once.
+
+    The first lag below `threshold` of every curve is found with an argmax
+    over a mask, and the integral up to the last lag above it read from a
+    single cumulative trapezoid of all the curves. The remaining piece up
+    to the crossing, linearly interpolated between both lags, is added,
+    so a threshold of zero integrates exactly to the first zero crossing.
+    NaNs, e.g. of NaN padded lags, end a curve as well.
+
+    ```
+    # Two point correlations of every location, (n_lags, n_locations, 3).
+    length_scales = integral_scales(correlations, separations).scales
+    ```
+
+    Parameters
+    ----------
+    correlation : np.ndarray
+        Correlations of any shape, the lags along `axis`.
+    lags : np.ndarray
+        (n_lags,) ascending separations or time lags, the first one zero.
+    threshold : float
+        Correlation level the curves are integrated down to, e.g. 0.3.
+    axis : int
+        Axis of the lags.
+
+    Returns
+    -------
+    IntegralScales
+        Scales and crossings of the shape of `correlation` without `axis`.
+    """
+    correlation = np.moveaxis(np.asarray(correlation, dtype=float), axis, 0)
+    lags = np.asarray(lags, dtype=float)
+    if len(lags) != len(correlation):
+        raise ValueError(f"Expected {len(correlation)} lags, got "
+                         f"{len(lags)}.")
+    lags = lags.reshape((-1,) + (1,)*(correlation.ndim - 1))
+    below = ~(correlation >= threshold)
+    crossed = below.any(axis=0)
+    # Index of the first lag below the threshold, n_lags if none is.
+    first = np.where(crossed, below.argmax(axis=0), len(correlation))
+    last_above = np.maximum(first - 1, 0)[np.newaxis]
+    integrals = cumulative_trapezoid(correlation, lags, axis=0, initial=0)
+    scales = np.take_along_axis(integrals, last_above, axis=0)[0]
+    # Interpolated piece from the last lag above to the crossing.
+    next_lag = np.minimum(first, len(correlation) - 1)[np.newaxis]
+    r_0 = np.take_along_axis(correlation, last_above, axis=0)[0]
+    r_1 = np.take_along_axis(correlation, next_lag, axis=0)[0]
+    x_0 = np.take_along_axis(np.broadcast_to(lags, correlation.shape),
+                             last_above, axis=0)[0]
+    x_1 = np.take_along_axis(np.broadcast_to(lags, correlation.shape),
+                             next_lag, axis=0)[0]
+    interpolated = crossed & (first > 0) & np.isfinite(r_1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crossings = np.where(interpolated,
+                             x_0 + (r_0 - threshold)/(r_0 - r_1)*(x_1 - x_0),
+                             x_0)
+    scales = scales + np.where(interpolated,
+                               0.5*(r_0 + threshold)*(crossings - x_0), 0)
+    crossings = np.where(crossed, crossings, np.nan)
+    return IntegralScales(scales=scales, crossings=crossings,
+                          threshold=threshold)
+
+
+def autocorrelation(values, max_lag=None, zero_padded=True, demean=True,
+                    chunk_series=DEFAULT_CHUNK_LINES) -> np.ndarray:
+    """Normalized autocorrelation of many time series at once.
+
+    Every series is correlated with itself with FFTs, as the lines of
+    `lagged_product_sums`, with zero padding giving the biased estimate
+    that divides every lag by the number of samples, or the average over
+    the overlap otherwise. NaN samples are skipped.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Array of shape (n_times, ...), e.g. (n_times, n_probes,
+        n_components) probe values.
+    max_lag : int
+        Largest lag kept in samples, default all.
+    zero_padded : bool
+        Whether padded samples count in the average.
+    demean : bool
+        Subtract the mean of every series first.
+    chunk_series : int
+        Series transformed at once.
+
+    Returns
+    -------
+    np.ndarray
+        Array of shape (n_lags, ...).
+    """
+    values = np.asarray(values, dtype=float)
+    series_shape = values.shape[1:]
+    # Series as lines of a single component, (n_series, n_times, 1).
+    series = values.reshape(len(values), -1).T[..., np.newaxis]
+    if demean:
+        series = series - np.nanmean(series, axis=1, keepdims=True)
+    product_sums, counts = lagged_product_sums(series, zero_padded,
+                                               chunk_series, per_line=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        covariance = product_sums/counts
+        correlation = covariance/covariance[:, :1]
+    if max_lag is not None:
+        correlation = correlation[:, :max_lag + 1]
+    return correlation[..., 0].T.reshape(-1, *series_shape)
+
+
+def integral_time_scales(values, sampling_rate,
+                         threshold=DEFAULT_CORRELATION_THRESHOLD,
+                         max_lag=None, zero_padded=True,
+                         chunk_series=DEFAULT_CHUNK_LINES) -> IntegralScales:
+    """Integral time scales of many time series, e.g. every probe and
+    component of a probe dataset, from their autocorrelations.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Array of shape (n_times, ...).
+    sampling_rate : float
+        Sampling frequency of the series.
+    threshold : float
+        Correlation level the autocorrelations are integrated down to.
+    max_lag : float
+        Largest time lag considered, default the whole record.
+    zero_padded : bool
+        Biased autocorrelation estimate, see `autocorrelation`.
+    chunk_series : int
+        Series transformed at once.
+
+    Returns
+    -------
+    IntegralScales
+        Scales and crossings of shape values.shape[1:].
+    """
+    if max_lag is not None:
+        max_lag = int(max_lag*sampling_rate)
+    correlation = autocorrelation(values, max_lag, zero_padded,
+                                  chunk_series=chunk_series)
+    return integral_scales(correlation,
+                           np.arange(len(correlation))/sampling_rate,
+                           threshold)
+
+
+def integral_length_scales_table(tpc_dfs: Mapping[str, pd.DataFrame],
+                                 threshold=DEFAULT_CORRELATION_THRESHOLD
+                                 ) -> pd.DataFrame:
+    """Integral length scales of the two point correlations of many
+    locations, e.g. the "twopointcorr.csv" of every "r1=..x1=.." directory.
+
+    Parameters
+    ----------
+    tpc_dfs : Mapping[str, pd.DataFrame]
+        Correlations of every location, indexed by separation with a
+        column per key, e.g. "B_uu". All must share index and columns.
+    threshold : float
+        Correlation level the curves are integrated down to, e.g. 0.3.
+
+    Returns
+    -------
+    pd.DataFrame
+        Scales indexed by location with a column per key.
+    """
+    locations = list(tpc_dfs)
+    first = tpc_dfs[locations[0]]
+    for location in locations[1:]:
+        tpc_df = tpc_dfs[location]
+        if (not tpc_df.index.equals(first.index)
+                or not tpc_df.columns.equals(first.columns)):
+            raise ValueError(f"Correlations of '{location}' do not share "
+                             f"the separations or keys of "
+                             f"'{locations[0]}'.")
+    # (n_lags, n_locations, n_keys)
+    correlation = np.stack([tpc_dfs[location].to_numpy()
+                            for location in locations], axis=1)
+    scales = integral_scales(correlation, first.index.to_numpy(),
+                             threshold).scales
+    return pd.DataFrame(scales, index=pd.Index(locations, name="Location"),
+                        columns=first.columns)
@@ -0,0 +1,202 @@
+import numpy as np
+from dataclasses import dataclass
+from scipy import fft as _fft
+from ._xcorr import DEFAULT_CHUNK_LINES
+from ._chunked import LineBlocks, iter_line_blocks
+
+
+@dataclass
+class SpaceTimeCorrelation:
+    """Space-time correlation R(dx, tau) of time resolved line samples.
+
+    `correlation[j, k]` is the correlation of a signal with itself shifted
+    by `separations[k]` along the line and by `time_lags[j]` in time, i.e.
+    the average of s(x, t)*s(x - dx, t - tau). A disturbance convected
+    towards increasing points therefore peaks at positive time lags.
+
+    Attributes:
+
+    separations -- (n_separations,) spatial separations, non negative
+    time_lags -- (n_time_lags,) time lags, ascending and centred on zero
+    correlation -- (n_time_lags, n_separations, n_components) array
+    time_step -- time between consecutive time lags
+    """
+    separations: np.ndarray
+    time_lags: np.ndarray
+    correlation: np.ndarray
+    time_step: float
+
+    def ridge(self, min_correlation=None):
+        """Time lag of the correlation peak of every separation and the
+        convection velocity dx/tau it implies.
+
+        The peak is located with a parabola through the maximum and its
+        two neighbours, for all separations and components at once.
+
+        Parameters
+        ----------
+        min_correlation : float
+            Peaks lower than this are discarded, i.e. set to NaN, as they
+            are dominated by noise once the structures have decorrelated.
+
+        Returns
+        -------
+        peak_time_lags : np.ndarray
+            Array of shape (n_separations, n_components).
+        velocities : np.ndarray
+            Array of shape (n_separations, n_components), NaN where the
+            peak lies at a zero time lag, e.g. at dx = 0.
+        """
+        correlation = np.where(np.isnan(self.correlation), -np.inf,
+                               self.correlation)
+        peaks = correlation.argmax(axis=0)[np.newaxis]
+        n_time_lags = len(self.time_lags)
+        neighbours = np.clip(np.concatenate([peaks - 1, peaks, peaks + 1]),
+                             0, n_time_lags - 1)
+        y_0, y_1, y_2 = np.take_along_axis(self.correlation, neighbours,
+                                           axis=0)
+        peaks = peaks[0]
+        curvature = y_0 - 2*y_1 + y_2
+        interior = (peaks > 0) & (peaks < n_time_lags - 1) & (curvature < 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            offsets = np.where(interior, 0.5*(y_0 - y_2)/curvature, 0)
+        peak_time_lags = self.time_lags[peaks] + offsets*self.time_step
+        if min_correlation is not None:
+            peak_time_lags[~(y_1 >= min_correlation)] = np.nan
+        with np.errstate(divide="ignore", invalid="ignore"):
+            velocities = np.where((peak_time_lags != 0)
+                                  & (self.separations[:, np.newaxis] > 0),
+                                  self.separations[:, np.newaxis]
+                                  / peak_time_lags, np.nan)
+        return peak_time_lags, velocities
+
+    def convection_velocity(self, min_correlation=None):
+        """(n_components,) least squares slope dx/tau of the ridge through
+        the origin, over the separations with a valid peak."""
+        peak_time_lags, _ = self.ridge(min_correlation)
+        separations = np.broadcast_to(self.separations[:, np.newaxis],
+                                      peak_time_lags.shape)
+        valid = np.isfinite(peak_time_lags)
+        return (np.where(valid, separations**2, 0).sum(axis=0)
+                / np.where(valid, separations*peak_time_lags, 0).sum(axis=0))
+
+
+def space_time_correlation(line_blocks: LineBlocks, index_length=1,
+                           time_step=1, zero_padded=True,
+                           max_separation=None, max_time_lag=None,
+                           chunk_lines=DEFAULT_CHUNK_LINES,
+                           workers=None) -> SpaceTimeCorrelation:
+    """Space-time correlation of a stack of time resolved line samples.
+
+    Every line and component is transformed with a single real 2-D FFT over
+    (time, point), zero padded against circular wrap around, and the power
+    spectra summed over lines before one inverse FFT yields every spatial
+    and temporal lag at once. Lines are consumed `chunk_lines` at a time,
+    from a (memory mapped) stack or an iterable of blocks, so memory is
+    bounded by a chunk.
+
+    Padding and NaNs are treated as in `SignalStackXCorrelationFunction`:
+    shifted out entries count as zero products if `zero_padded`, otherwise
+    only the overlap is averaged, and the correlation is normalized by the
+    mean square of every component. At a zero time lag the result equals
+    the spatial correlation of the stack with lines and times merged.
+
+    Parameters
+    ----------
+    line_blocks : np.ndarray or Iterable[np.ndarray]
+        Array of shape (n_lines, n_times, n_points, n_components), or
+        blocks of that shape.
+    index_length : float
+        Separation between consecutive points.
+    time_step : float
+        Time between consecutive samples.
+    zero_padded : bool
+        Whether padded entries count in the average.
+    max_separation, max_time_lag : float
+        Largest separation and absolute time lag kept, default all.
+    chunk_lines : int
+        Lines transformed at once.
+    workers : int
+        Threads of the FFTs, see `scipy.fft`. Negative values count from
+        the number of CPUs.
+
+    Returns
+    -------
+    SpaceTimeCorrelation
+    """
+    power_sum = 0
+    mask_power_sum = 0
+    valid_sum = 0
+    square_sum = 0
+    n_entries = 0
+    shape = None
+    for block in iter_line_blocks(line_blocks, chunk_lines):
+        if block.ndim != 4:
+            raise ValueError(f"Expected blocks of shape (n_lines, n_times, "
+                             f"n_points, n_components), got {block.shape}.")
+        if shape is None:
+            shape = block.shape[1:3]
+            # Zero padding to at least 2*n - 1 avoids circular wrap around.
+            fft_shape = tuple(_fft.next_fast_len(2*n - 1, real=True)
+                              for n in shape)
+        elif block.shape[1:3] != shape:
+            raise ValueError(f"Block of shape {block.shape} does not match "
+                             f"(n_times, n_points) = {shape}.")
+        valid = np.isfinite(block)
+        spectra = _fft.rfft2(np.where(valid, block, 0), s=fft_shape,
+                             axes=(1, 2), workers=workers)
+        power_sum = power_sum + (spectra.real**2
+                                 + spectra.imag**2).sum(axis=0)
+        mask_spectra = _fft.rfft2(valid.astype(float), s=fft_shape,
+                                  axes=(1, 2), workers=workers)
+        mask_power_sum = mask_power_sum + (mask_spectra.real**2
+                                           + mask_spectra.imag**2
+                                           ).sum(axis=0)
+        valid_sum = valid_sum + valid.sum(axis=0)
+        # NaNs propagate, as in the mean of the direct method.
+        square_sum = square_sum + (block**2).sum(axis=(0, 1, 2))
+        n_entries += block.shape[0]*block.shape[1]*block.shape[2]
+    if shape is None:
+        raise ValueError("No lines were given.")
+    n_times, n_points = shape
+    n_lags = n_points
+    if max_separation is not None:
+        n_lags = min(int(max_separation/index_length) + 1, n_points)
+    n_time_lags = n_times
+    if max_time_lag is not None:
+        n_time_lags = min(int(max_time_lag/time_step) + 1, n_times)
+    # Time lags -n_time_lags + 1, ..., n_time_lags - 1, negative ones wrap
+    # around to the end of the inverse transform.
+    time_index = np.arange(-n_time_lags + 1, n_time_lags)
+    product_sums = _fft.irfft2(power_sum, s=fft_shape, axes=(0, 1),
+                               workers=workers)[time_index, :n_lags]
+    counts = np.rint(_fft.irfft2(mask_power_sum, s=fft_shape, axes=(0, 1),
+                                 workers=workers)[time_index, :n_lags])
+    if zero_padded:
+        counts += _padded_counts(valid_sum, time_index, n_lags)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        correlation = product_sums/counts/(square_sum/n_entries)
+    return SpaceTimeCorrelation(separations=np.arange(n_lags)*index_length,
+                                time_lags=time_index*time_step,
+                                correlation=correlation,
+                                time_step=time_step)
+
+
+def _padded_counts(valid_sum, time_index, n_lags):
+    """Number of valid entries whose partner at every lag is a padded one,
+    from the (n_times, n_points, n_components) count of valid entries."""
+    n_times = len(valid_sum)
+    # in_range[t, k]: valid entries at points i >= k and times >= t.
+    in_range = valid_sum[::-1, ::-1].cumsum(axis=0).cumsum(axis=1)[::-1, ::-1]
+    in_range = np.concatenate([in_range[:, :n_lags],
+                               np.zeros((1, n_lags) + valid_sum.shape[2:])])
+    total = in_range[0, 0]
+    # A partner at t - tau is in range for t >= tau if tau >= 0, and for
+    # t < n_times + tau otherwise.
+    positive = time_index >= 0
+    partnered = np.where(
+        positive[:, np.newaxis, np.newaxis],
+        in_range[np.where(positive, time_index, 0)],
+        in_range[0] - in_range[np.where(positive, n_times, n_times
+                                        + time_index)])
+    return total[np.newaxis] - partnered
@@ -1,5 +1,8 @@
 import numpy as np
 from abc import ABC, abstractmethod
+from scipy import fft as _fft
+
+DEFAULT_CHUNK_LINES = 256
 
 
 class XCorrelationFunction(ABC):
@@ -14,10 +17,30 @@ class XCorrelationFunction(ABC):
 
 
 class SignalStackXCorrelationFunction(XCorrelationFunction):
+    """Two point correlation of a stack of signals along their point axis.
+
+    `signal_stack` has shape (n_lines, n_points, n_components). A
+    separation `x_asterisk` is mapped to a shift of
+    `int(x_asterisk/index_length)` points. Shifted out points are padded
+    with zeros if `zero_padded`, which keeps every point in the average,
+    or with NaN otherwise, which averages over the overlap only.
+
+    With `method="fft"` every lag of every line and component is computed
+    at once with batched real FFTs along the point axis, instead of
+    building a shifted copy of every signal per separation. NaNs are
+    handled by correlating validity masks as well.
+    """
 
-    def __init__(self, signal_stack, index_length=1, zero_padded=True):
-        self.__xcorr_func = self._compute_xcorr_function(signal_stack,
-                                                         index_length)
+    def __init__(self, signal_stack, index_length=1, zero_padded=True,
+                 method="direct"):
+        if method == "direct":
+            self.__xcorr_func = self._compute_xcorr_function(
+                signal_stack, index_length, zero_padded)
+        elif method == "fft":
+            self.__xcorr_func = self._compute_fft_xcorr_function(
+                signal_stack, index_length, zero_padded)
+        else:
+            raise ValueError(f"Unknown method '{method}'.")
 
     def __call__(self, x_asterisk):
         x_asterisk = np.asarray(x_asterisk)
@@ -50,3 +73,114 @@ class SignalStackXCorrelationFunction(XCorrelationFunction):
             return np.nanmean(cov_arrays, axis=(0, 1))/variance
         return xcorr_func
 
+    @staticmethod
+    def _compute_fft_xcorr_function(signal_stack: np.ndarray,
+                                    index_length=1,
+                                    zero_padded=True,
+                                    chunk_lines=DEFAULT_CHUNK_LINES):
+        signal_stack = np.asarray(signal_stack, dtype=float)
+        variance = (signal_stack**2
+                    ).reshape(-1, signal_stack.shape[-1]).mean(axis=0)
+        product_sums, counts = lagged_product_sums(signal_stack, zero_padded,
+                                                   chunk_lines)
+        return lagged_xcorr_function(product_sums, counts, variance,
+                                     index_length, zero_padded)
+
+
+def lagged_xcorr_function(product_sums, counts, variance, index_length=1,
+                          zero_padded=True):
+    """Correlation function of separations `x_asterisk` from the lagged
+    product sums and counts returned by `lagged_product_sums`."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        correlation = product_sums/counts/variance
+    n_points = len(correlation)
+
+    def xcorr_func(x_asterisk):
+        index_shift = int(x_asterisk/index_length)
+        if index_shift < 0:
+            raise ValueError("Separations must not be negative.")
+        if index_shift < n_points:
+            return correlation[index_shift]
+        # Every point is padded.
+        if zero_padded:
+            return np.zeros(len(variance))/variance
+        return np.full(len(variance), np.nan)
+    return xcorr_func
+
+
+def lagged_product_sums(signal_stack, zero_padded=True,
+                        chunk_lines=DEFAULT_CHUNK_LINES, per_line=False):
+    """Sums of the lagged products of a stack of signals and the number of
+    products averaged, for every lag, with batched FFTs.
+
+    For a lag k the products s[i]*s[i - k] of every line are summed, NaNs
+    excluded. Points i < k count as zero products if `zero_padded`, as in
+    `SignalStackXCorrelationFunction`.
+
+    Lines are transformed `chunk_lines` at a time and their power spectra
+    summed before a single inverse FFT, so memory is bounded by a chunk.
+
+    Parameters
+    ----------
+    signal_stack : np.ndarray
+        Array of shape (n_lines, n_points, n_components).
+    zero_padded : bool
+        Whether padded points count in the average.
+    chunk_lines : int
+        Lines transformed at once.
+    per_line : bool
+        Keep the sums of every line apart instead, e.g. for resampling.
+
+    Returns
+    -------
+    product_sums : np.ndarray
+        Array of shape (n_points, n_components), indexed by lag, or
+        (n_lines, n_points, n_components) if `per_line`.
+    counts : np.ndarray
+        Array of the same shape as `product_sums`.
+    """
+    n_points = signal_stack.shape[1]
+    # Zero padding to at least 2*n_points - 1 avoids circular wrap around.
+    n_fft = _fft.next_fast_len(2*n_points - 1, real=True)
+    power_sum = 0
+    mask_power_sum = 0
+    prefix_counts = 0
+    line_sums = []
+    for start in range(0, len(signal_stack), chunk_lines):
+        block = np.asarray(signal_stack[start:start + chunk_lines],
+                           dtype=float)
+        valid = np.isfinite(block)
+        spectra = _fft.rfft(np.where(valid, block, 0), n=n_fft, axis=1)
+        power = spectra.real**2 + spectra.imag**2
+        mask_spectra = _fft.rfft(valid.astype(float), n=n_fft, axis=1)
+        mask_power = mask_spectra.real**2 + mask_spectra.imag**2
+        if per_line:
+            line_sums.append(_line_lag_sums(power, mask_power, valid, n_fft,
+                                            zero_padded))
+            continue
+        power_sum = power_sum + power.sum(axis=0)
+        mask_power_sum = mask_power_sum + mask_power.sum(axis=0)
+        if zero_padded:
+            # Valid points i < k, each multiplied by a padded zero.
+            prefix_counts = prefix_counts + np.cumsum(valid, axis=1).sum(
+                axis=0)
+    if per_line:
+        product_sums, counts = zip(*line_sums)
+        return np.concatenate(product_sums), np.concatenate(counts)
+    product_sums = _fft.irfft(power_sum, n=n_fft, axis=0)[:n_points]
+    counts = np.rint(_fft.irfft(mask_power_sum, n=n_fft,
+                               axis=0)[:n_points])
+    if zero_padded:
+        counts[1:] += prefix_counts[:-1]
+    return product_sums, counts
+
+
+def _line_lag_sums(power, mask_power, valid, n_fft, zero_padded):
+    """Product sums and counts of every line of a block from its power
+    spectra, as in `lagged_product_sums`."""
+    n_points = valid.shape[1]
+    product_sums = _fft.irfft(power, n=n_fft, axis=1)[:, :n_points]
+    counts = np.rint(_fft.irfft(mask_power, n=n_fft, axis=1)[:, :n_points])
+    if zero_padded:
+        counts[:, 1:] += np.cumsum(valid, axis=1)[:, :-1]
+    return product_sums, counts
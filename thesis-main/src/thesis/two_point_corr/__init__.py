@@ -3,18 +3,21 @@ import pandas as pd
 import matplotlib.pyplot as plt
 from cflowpost.xcorr import \
     SignalStackXCorrelationFunction as TwoPointCorrelationFunction
+from cflowpost.xcorr import correlation_confidence_bands
 import cflowpost.plotting as cfplot
 
 
 def compute_two_point_correlation(fluct_stack, arc_length,
                                   zero_padded=True,
-                                  tpc_keys=None):
+                                  tpc_keys=None,
+                                  method="fft"):
     index_length = 1
     if arc_length is not None:
         index_length = arc_length / fluct_stack.shape[1]
 
     tpc_func = TwoPointCorrelationFunction(fluct_stack, index_length,
-                                           zero_padded=zero_padded)
+                                           zero_padded=zero_padded,
+                                           method=method)
     points_per_line = fluct_stack.shape[1]
     x_ast = np.linspace(0, arc_length, points_per_line)
     df = pd.DataFrame(data={"x_ast": x_ast})
@@ -72,6 +75,44 @@ def plot_sample_independence(fluct_stack,
         fig.savefig(output_file, **kwargs)
 
 
+def plot_confidence_bands(fluct_stack,
+                          arc_length,
+                          tpc_keys,
+                          output_file="",
+                          figwidth=8,
+                          height_to_width_ration=0.5,
+                          method="bootstrap",
+                          n_replicas=1000,
+                          confidence=0.95,
+                          random_state=0,
+                          zero_padded=True,
+                          max_workers=None,
+                          **kwargs):
+    index_length = arc_length / fluct_stack.shape[1]
+    bands = correlation_confidence_bands(fluct_stack, index_length,
+                                         zero_padded=zero_padded,
+                                         method=method,
+                                         n_replicas=n_replicas,
+                                         confidence=confidence,
+                                         random_state=random_state,
+                                         max_workers=max_workers)
+    bands_df = bands.to_dataframe(tpc_keys)
+    total_plots = len(tpc_keys)
+    figheight = figwidth*height_to_width_ration*total_plots
+    fig, axs = plt.subplots(total_plots, 1, figsize=(figwidth, figheight))
+    for key, ax in zip(tpc_keys, np.atleast_1d(axs)):
+        ax.plot(bands_df.index, bands_df[key], label=key)
+        ax.fill_between(bands_df.index, bands_df[f"{key}_lower"],
+                        bands_df[f"{key}_upper"], alpha=0.3,
+                        label=f"{confidence:.0%} {method}")
+        ax.legend()
+        ax.set_title(key)
+    fig.subplots_adjust(top=0.97, bottom=0.03)
+    if output_file:
+        fig.savefig(output_file, **kwargs)
+    return bands_df
+
+
 def _sampled_tpc(fluct_stack, sample_indices, arc_length, zero_padded):
     sampled_flucts = fluct_stack[sample_indices]
     return compute_two_point_correlation(sampled_flucts,